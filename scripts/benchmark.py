@@ -0,0 +1,138 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from clean_files import YEARS
+from report import REPORT_DIR
+from synthetic import generate
+
+# Parcels per year in each benchmark run
+BENCH_SIZES = [
+    int(size) for size in os.getenv("BENCH_SIZES", "10000,100000,400000").split(",")
+]
+# Generated inputs are kept here and reused by later runs, if set
+BENCH_DIR = os.getenv("BENCH_DIR")
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Run in pipeline order, own_id_map rebuilds the map the others read
+SCRIPTS = ["own_id_map.py", "clean_files.py", "identify_ownership.py"]
+
+
+# The scripts find input/ and data/ next to their own directory, so each size
+# gets a tree with the scripts linked in beside its generated input/
+def bench_root(base_dir, parcels):
+    root = os.path.join(base_dir, f"parcels-{parcels}")
+    if not os.path.exists(os.path.join(root, "input")):
+        print(f"generating {parcels} parcels per year")
+        generate(os.path.join(root, "input.tmp"), YEARS, parcels)
+        os.replace(os.path.join(root, "input.tmp"), os.path.join(root, "input"))
+    if not os.path.exists(os.path.join(root, "scripts")):
+        os.symlink(SCRIPTS_DIR, os.path.join(root, "scripts"))
+    # Every run starts cold
+    for dirname in ["data", "cache"]:
+        shutil.rmtree(os.path.join(root, dirname), ignore_errors=True)
+    os.makedirs(os.path.join(root, "data"))
+    return root
+
+
+# Times a whole script, with its CPU time and peak RSS taken from the process
+def run_script(root, script, env):
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join("scripts", script)],
+        cwd=root,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    _, status, usage = os.wait4(process.pid, 0)
+    if os.waitstatus_to_exitcode(status) != 0:
+        sys.exit(f"{script} failed in {root}")
+    return {
+        "stage": script,
+        "year": None,
+        "rows_in": None,
+        "rows_out": None,
+        "wall_s": round(time.perf_counter() - start, 3),
+        "cpu_s": round(usage.ru_utime + usage.ru_stime, 3),
+        "peak_rss_mb": round(usage.ru_maxrss / 1024),
+        "peak_rss_delta_mb": None,
+    }
+
+
+def run_benchmark(base_dir, parcels):
+    root = bench_root(base_dir, parcels)
+    clean_report = os.path.join(root, "clean-files-report.json")
+    env = {
+        **os.environ,
+        "CACHE_DIR": os.path.join(root, "cache"),
+        "RUN_REPORT": clean_report,
+    }
+    # Only loaded when there's a database to load into
+    if "DATABASE_URL" not in os.environ:
+        env["SKIP_LOAD"] = "1"
+
+    stages = []
+    for script in SCRIPTS:
+        print(f"{parcels}: running {script}")
+        stages.append(run_script(root, script, env))
+    with open(clean_report) as report_file:
+        stages.extend(json.load(report_file)["stages"])
+    return {
+        "settings": {
+            "parcels": parcels,
+            "years": YEARS,
+            "load": "SKIP_LOAD" not in env,
+        },
+        "stages": stages,
+    }
+
+
+# Totals for each stage across years, with the slowest stages first
+def print_summary(reports):
+    totals = {}
+    for parcels, report in reports.items():
+        for record in report["stages"]:
+            name = record["stage"]
+            if record.get("output") and record["stage"] == "load":
+                name = f"load {record['output']}"
+            totals.setdefault(name, {}).setdefault(parcels, 0)
+            totals[name][parcels] += record["wall_s"]
+
+    print(f"{'stage':<24}" + "".join(f"{parcels:>12}" for parcels in reports))
+    for name, by_size in sorted(
+        totals.items(), key=lambda item: -max(item[1].values())
+    ):
+        print(
+            f"{name:<24}"
+            + "".join(
+                f"{by_size[parcels]:>11.2f}s" if parcels in by_size else f"{'-':>12}"
+                for parcels in reports
+            )
+        )
+
+
+if __name__ == "__main__":
+    report_dir = os.path.join(REPORT_DIR, f"benchmark-{time.strftime('%Y%m%d-%H%M%S')}")
+    os.makedirs(report_dir)
+    base_dir = BENCH_DIR or tempfile.mkdtemp(prefix="praxis-bench-")
+
+    reports = {}
+    try:
+        for parcels in BENCH_SIZES:
+            reports[parcels] = run_benchmark(base_dir, parcels)
+            # Same layout as the clean_files run report, so report.py can compare them
+            with open(
+                os.path.join(report_dir, f"parcels-{parcels}.json"), "w"
+            ) as report_file:
+                json.dump(reports[parcels], report_file, indent=2)
+    finally:
+        if not BENCH_DIR:
+            shutil.rmtree(base_dir)
+
+    print_summary(reports)
+    print(f"wrote benchmark reports to {report_dir}")
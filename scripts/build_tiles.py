@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from cache import hash_files, load_manifest, save_manifest
+
+YEARS = [2015, 2016, 2017, 2018, 2019, 2020, 2021, 2022, 2023, 2024, 2025]
+LAYERS = ["parcels", "parcels-centroids"]
+
+# tippecanoe already uses several threads per job, so run fewer jobs than cores
+WORKERS = int(os.getenv("WORKERS", max(1, (os.cpu_count() or 1) // 2)))
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+TILES_DIR = os.path.join(BASE_DIR, "tiles")
+MANIFEST_FILENAME = os.path.join(TILES_DIR, "tile-manifest.json")
+
+
+def dir_size(dirname):
+    return sum(
+        os.path.getsize(os.path.join(root, filename))
+        for root, _, filenames in os.walk(dirname)
+        for filename in filenames
+    )
+
+
+# The Makefile rules stay the only place the tippecanoe options are defined, make
+# is just told to rebuild the target regardless of timestamps
+def build_tileset(name):
+    start = time.perf_counter()
+    subprocess.run(
+        ["make", "--always-make", f"tiles/{name}/"],
+        cwd=BASE_DIR,
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    return {
+        "seconds": round(time.perf_counter() - start, 1),
+        "bytes": dir_size(os.path.join(TILES_DIR, name)),
+    }
+
+
+if __name__ == "__main__":
+    os.makedirs(TILES_DIR, exist_ok=True)
+    manifest = load_manifest(MANIFEST_FILENAME)
+
+    jobs = {}
+    for year in YEARS:
+        for layer in LAYERS:
+            name = f"{layer}-{year}"
+            input_hash = hash_files([os.path.join(DATA_DIR, f"{name}.geojson")])
+            if manifest.get(name, {}).get("input") == input_hash and os.path.isdir(
+                os.path.join(TILES_DIR, name)
+            ):
+                print(f"{name} unchanged")
+                continue
+            jobs[name] = input_hash
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        futures = {executor.submit(build_tileset, name): name for name in jobs}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                result = future.result()
+            except subprocess.CalledProcessError as error:
+                print(f"{name} failed: {error}")
+                failed.append(name)
+                continue
+            # Recorded as each job finishes, so a failed run keeps what did build
+            manifest[name] = {"input": jobs[name], **result}
+            save_manifest(MANIFEST_FILENAME, manifest)
+            print(
+                f"{name}: {manifest[name]['seconds']}s, "
+                f"{manifest[name]['bytes'] / 1e6:.1f}MB"
+            )
+
+    if failed:
+        sys.exit(f"failed to build {', '.join(sorted(failed))}")
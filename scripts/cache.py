@@ -0,0 +1,110 @@
+import glob
+import hashlib
+import json
+import os
+
+import geopandas as gpd
+import pandas as pd
+
+CACHE_DIR = os.getenv(
+    "CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache"),
+)
+FRAME_DIR = os.path.join(CACHE_DIR, "frames")
+
+
+# Shapefiles are spread across sidecar files that all affect what gets read
+def source_files(filename):
+    if filename.endswith(".shp"):
+        return sorted(glob.glob(glob.escape(filename[: -len(".shp")]) + ".*"))
+    return [filename]
+
+
+# Digests are remembered by path, size and mtime so each file is only read once
+_file_digests = {}
+
+
+def file_digest(filename):
+    stat = os.stat(filename)
+    digest_key = (os.path.abspath(filename), stat.st_size, stat.st_mtime_ns)
+    if digest_key not in _file_digests:
+        digest = hashlib.sha256()
+        with open(filename, "rb") as source_file:
+            for chunk in iter(lambda: source_file.read(1 << 20), b""):
+                digest.update(chunk)
+        _file_digests[digest_key] = digest.hexdigest()
+    return _file_digests[digest_key]
+
+
+def hash_files(filenames, *extra):
+    digest = hashlib.sha256()
+    for filename in filenames:
+        digest.update(file_digest(filename).encode())
+    for value in extra:
+        digest.update(value if isinstance(value, bytes) else str(value).encode())
+    return digest.hexdigest()[:16]
+
+
+def frame_path(name, key):
+    return os.path.join(FRAME_DIR, f"{name}-{key}.parquet")
+
+
+def has_frame(name, key):
+    return bool(CACHE_DIR) and os.path.exists(frame_path(name, key))
+
+
+def load_frame(name, key, geo=False):
+    if not has_frame(name, key):
+        return None
+    if geo:
+        return gpd.read_parquet(frame_path(name, key))
+    return pd.read_parquet(frame_path(name, key))
+
+
+# Writes a frame under its key and evicts entries for older keys of the same name
+def save_frame(name, key, df):
+    if not CACHE_DIR:
+        return
+    os.makedirs(FRAME_DIR, exist_ok=True)
+    for stale_path in glob.glob(
+        os.path.join(glob.escape(FRAME_DIR), f"{name}-*.parquet")
+    ):
+        if stale_path != frame_path(name, key):
+            os.remove(stale_path)
+    df.to_parquet(frame_path(name, key), index=False)
+
+
+def load_manifest(filename):
+    if not os.path.exists(filename):
+        return {}
+    with open(filename) as manifest_file:
+        return json.load(manifest_file)
+
+
+def save_manifest(filename, manifest):
+    with open(filename, "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+
+
+def outputs_unchanged(directory, output_hashes):
+    return bool(output_hashes) and all(
+        os.path.exists(os.path.join(directory, name))
+        and hash_files([os.path.join(directory, name)]) == output_hash
+        for name, output_hash in output_hashes.items()
+    )
+
+
+# Writes through a temporary file and only replaces the output if its contents
+# changed, so make doesn't see a newer file and rebuild what depends on it
+def write_if_changed(filename, write):
+    root, ext = os.path.splitext(filename)
+    tmp_filename = f"{root}.tmp{ext}"
+    if os.path.exists(tmp_filename):
+        os.remove(tmp_filename)
+    write(tmp_filename)
+    output_hash = hash_files([tmp_filename])
+    if os.path.exists(filename) and hash_files([filename]) == output_hash:
+        os.remove(tmp_filename)
+    else:
+        os.replace(tmp_filename, filename)
+    return output_hash
@@ -1,9 +1,10 @@
 import os
-import re
 
 import geopandas as gpd
 import numpy as np
 import pandas as pd
+from normalize import clean_owner_series, load_cache, save_cache
+from owners import format_counts, resolve_own_ids
 
 TMP_DATA_DIR = os.path.join(
     os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tmpdata"
@@ -19,16 +20,10 @@ SPACE_RE = r"\s+"
 CLEAN_RE = r"(\.|,)"
 ADDR_SUFFIX_RE = r" (DR|DRIVE|AVE|AVENUE|ST|STREET|BLVD|BOULEVARD|FWY|FREEWAY)\.?$"
 LLC_RE = r" (LLC|INC|CO)\b"
-DETROIT_RE = r"LAND BANK|CITY OF DETROIT|DETROIT PARKS|City of Detroit|BRIDGE AUTHORITY|MDOT|DEPARTMENT OF"  # noqa
-
-
-def clean_owner(owner):
-    if not isinstance(owner, str):
-        return ""
-    return re.sub(r"\s+", " ", re.sub(r"[^A-Za-z0-9 ]+", "", owner)).strip()
 
 
 if __name__ == "__main__":
+    load_cache("owner")
     cur_df = pd.read_csv(os.path.join(TMP_DATA_DIR, "cur_data.csv"))
     new_df = pd.read_csv(os.path.join(TMP_DATA_DIR, "new_2021_with_tp_address.csv"))
 
@@ -82,18 +77,20 @@ if __name__ == "__main__":
     parcel_merge_df["propdir"] = ""
     parcel_merge_df["propzip"] = parcel_merge_df["taxpayer_z"]
 
-    own_id_map = {}
-    for record in pd.read_csv(os.path.join(INPUT_DIR, "own-id-map.csv")).to_dict(
-        orient="records"
-    ):
-        own_id_map[clean_owner(record["taxpayer1"])] = record["own_id"]
+    own_id_df = pd.read_csv(os.path.join(INPUT_DIR, "own-id-map.csv"))
+    own_id_map = dict(
+        zip(clean_owner_series(own_id_df["taxpayer1"]), own_id_df["own_id"])
+    )
 
-    parcel_merge_df["own_id"] = (
-        parcel_merge_df["taxpayer_1"]
-        .apply(clean_owner)
-        .map(own_id_map)
-        .fillna(parcel_merge_df["taxpayer_2"].apply(clean_owner).map(own_id_map))
+    parcel_merge_df["own_id"], counts = resolve_own_ids(
+        own_id_map,
+        [
+            ("taxpayer_1", clean_owner_series(parcel_merge_df["taxpayer_1"])),
+            ("taxpayer_2", clean_owner_series(parcel_merge_df["taxpayer_2"])),
+        ],
     )
+    print(f"own_ids: {format_counts(counts)}")
+    save_cache("owner")
 
     parcel_merge_df = parcel_merge_df[~pd.isnull(parcel_merge_df["own_id"])]
     parcel_merge_df.to_file(
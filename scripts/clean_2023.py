@@ -1,8 +1,9 @@
 import os
-import re
 
 import geopandas as gpd
 import pandas as pd
+from normalize import clean_owner_series, load_cache, save_cache
+from owners import format_counts, resolve_own_ids
 
 COL_MAP = {
     "pnum": "parcel_num",
@@ -29,27 +30,24 @@ INPUT_DIR = os.path.join(
 )
 
 
-def clean_owner(owner):
-    if not isinstance(owner, str):
-        return ""
-    return re.sub(r"\s+", " ", re.sub(r"[^A-Za-z0-9 ]+", "", owner)).strip()
-
-
 if __name__ == "__main__":
+    load_cache("owner")
     parcel_gdf = gpd.read_file(os.path.join(INPUT_DIR, "city", "parcels_2023.geojson"))
 
-    own_id_map = {}
-    for record in pd.read_csv(os.path.join(INPUT_DIR, "own-id-map.csv")).to_dict(
-        orient="records"
-    ):
-        own_id_map[clean_owner(record["taxpayer1"])] = record["own_id"]
-
-    parcel_gdf["own_id"] = (
-        parcel_gdf["taxpayer_1"]
-        .apply(clean_owner)
-        .map(own_id_map)
-        .fillna(parcel_gdf["taxpayer_2"].apply(clean_owner).map(own_id_map))
+    own_id_df = pd.read_csv(os.path.join(INPUT_DIR, "own-id-map.csv"))
+    own_id_map = dict(
+        zip(clean_owner_series(own_id_df["taxpayer1"]), own_id_df["own_id"])
+    )
+
+    parcel_gdf["own_id"], counts = resolve_own_ids(
+        own_id_map,
+        [
+            ("taxpayer_1", clean_owner_series(parcel_gdf["taxpayer_1"])),
+            ("taxpayer_2", clean_owner_series(parcel_gdf["taxpayer_2"])),
+        ],
     )
+    print(f"own_ids: {format_counts(counts)}")
+    save_cache("owner")
     parcel_gdf["propstr"] = ""
 
     parcel_gdf = parcel_gdf[~pd.isnull(parcel_gdf["own_id"])]
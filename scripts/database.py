@@ -0,0 +1,306 @@
+import graphlib
+import io
+import re
+import time
+
+import geopandas as gpd
+import pandas as pd
+import shapely
+
+# Rows are sent to COPY in chunks so only one chunk is ever held as text
+COPY_CHUNK_SIZE = 100_000
+NULL = "\\N"
+
+# Tables are built in STAGING_SCHEMA and only moved into LIVE_SCHEMA once loaded
+STAGING_SCHEMA = "staging"
+LIVE_SCHEMA = "public"
+RETIRED_SCHEMA = "retired"
+
+
+def geometry_columns(df):
+    return [
+        col for col in df.columns if isinstance(df[col].dtype, gpd.array.GeometryDtype)
+    ]
+
+
+# The SRID to_postgis gives a geometry column, falling back to lower confidence
+# EPSG matches before leaving it undefined
+def geometry_srid(crs):
+    if crs is None:
+        return 0
+    for confidence in (100, 70, 25):
+        srid = crs.to_epsg(min_confidence=confidence)
+        if srid is not None:
+            return srid
+    return 0
+
+
+# COPY can't go through PostGIS adapters, so geometries are sent as EWKB hex, the
+# same encoding to_postgis inserts
+def ewkb_frame(df):
+    ewkb_df = pd.DataFrame(df)
+    for col in geometry_columns(df):
+        srid = geometry_srid(df[col].crs)
+        ewkb_df[col] = shapely.to_wkb(
+            shapely.set_srid(df[col].to_numpy(), srid), hex=True, include_srid=True
+        )
+    return ewkb_df
+
+
+# Creates the table from the frame's columns the same way to_sql/to_postgis would
+# if it doesn't exist yet, without inserting anything
+def create_table_if_missing(engine, table, df, schema=None):
+    if geometry_columns(df):
+        gpd.GeoDataFrame(df.head(0)).to_postgis(
+            table, engine, schema=schema, if_exists="append", index=False
+        )
+    else:
+        df.head(0).to_sql(table, engine, schema=schema, if_exists="append", index=False)
+
+
+def copy_frame(engine, table, df, schema=None):
+    create_table_if_missing(engine, table, df, schema=schema)
+    columns = ", ".join(f'"{col}"' for col in df.columns)
+    target = f"{schema}.{table}" if schema else table
+    sql = f"COPY {target} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '{NULL}')"
+
+    start = time.perf_counter()
+    conn = engine.raw_connection()
+    try:
+        with conn.cursor() as cursor:
+            for chunk_start in range(0, len(df), COPY_CHUNK_SIZE):
+                buffer = io.StringIO()
+                ewkb_frame(df.iloc[chunk_start : chunk_start + COPY_CHUNK_SIZE]).to_csv(
+                    buffer, index=False, header=False, na_rep=NULL
+                )
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+        conn.commit()
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"wrote {table}: {len(df)} rows in {elapsed:.1f}s "
+        f"({len(df) / max(elapsed, 1e-9):,.0f} rows/s)"
+    )
+    return len(df)
+
+
+# Recreates the staging schema and runs the schema file inside it, if given.
+# Extensions stay in the live schema so they aren't moved or dropped with the tables.
+def create_staging_schema(engine, schema_filename=None):
+    schema_sql = None
+    if schema_filename:
+        with open(schema_filename) as schema_file:
+            schema_sql = schema_file.read()
+    with engine.begin() as conn:
+        for extension in ["postgis", "pg_trgm"]:
+            conn.exec_driver_sql(
+                f"CREATE EXTENSION IF NOT EXISTS {extension} SCHEMA {LIVE_SCHEMA}"
+            )
+        conn.exec_driver_sql(f"DROP SCHEMA IF EXISTS {STAGING_SCHEMA} CASCADE")
+        conn.exec_driver_sql(f"CREATE SCHEMA {STAGING_SCHEMA}")
+        if schema_sql:
+            conn.exec_driver_sql(
+                f"SET LOCAL search_path TO {STAGING_SCHEMA}, {LIVE_SCHEMA}"
+            )
+            conn.exec_driver_sql(schema_sql)
+
+
+def create_year_partitions(engine, table, years, schema=None):
+    prefix = f"{schema}." if schema else ""
+    with engine.begin() as conn:
+        for year in years:
+            conn.exec_driver_sql(
+                f"CREATE TABLE IF NOT EXISTS {prefix}{table}_{year} "
+                f"PARTITION OF {prefix}{table} FOR VALUES IN ({year})"
+            )
+
+
+def check_staging_counts(engine, row_counts):
+    with engine.connect() as conn:
+        for table, expected in row_counts.items():
+            count = conn.exec_driver_sql(
+                f"SELECT count(*) FROM {STAGING_SCHEMA}.{table}"
+            ).scalar()
+            print(f"{STAGING_SCHEMA}.{table}: {count} rows")
+            if count == 0 or count != expected:
+                raise ValueError(
+                    f"{STAGING_SCHEMA}.{table} has {count} rows, expected {expected}"
+                )
+
+
+def schema_relations(conn, schema):
+    return conn.exec_driver_sql(
+        f"""
+        SELECT c.relname, c.relkind
+        FROM pg_class AS c
+        JOIN pg_namespace AS n ON n.oid = c.relnamespace
+        WHERE n.nspname = '{schema}'
+        AND c.relkind IN ('r', 'p', 'v', 'm')
+        """
+    ).all()
+
+
+# Views that are being read need CONCURRENTLY, which relies on each view having a
+# unique index, so readers aren't blocked while they're recomputed
+def refresh_views(engine, schema, concurrently=False):
+    with engine.connect() as conn:
+        views = [name for name, kind in schema_relations(conn, schema) if kind == "m"]
+    for name in views:
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "REFRESH MATERIALIZED VIEW "
+                f"{'CONCURRENTLY ' if concurrently else ''}{schema}.{name}"
+            )
+        print(f"refreshed {schema}.{name} in {time.perf_counter() - start:.1f}s")
+
+
+# Views and materialized views anywhere that read from a relation in the schema,
+# as (schema, name, referenced relation) rows
+def view_dependencies(conn, schema):
+    return conn.exec_driver_sql(
+        f"""
+        SELECT DISTINCT dn.nspname, dependent.relname, referenced.relname
+        FROM pg_depend AS d
+        JOIN pg_rewrite AS r ON r.oid = d.objid
+        JOIN pg_class AS dependent ON dependent.oid = r.ev_class
+        JOIN pg_namespace AS dn ON dn.oid = dependent.relnamespace
+        JOIN pg_class AS referenced ON referenced.oid = d.refobjid
+        JOIN pg_namespace AS rn ON rn.oid = referenced.relnamespace
+        WHERE rn.nspname = '{schema}'
+        AND d.classid = 'pg_rewrite'::regclass
+        AND d.refclassid = 'pg_class'::regclass
+        AND dependent.oid <> referenced.oid
+        """
+    ).all()
+
+
+# Moves every staged relation into the live schema in one transaction, so readers
+# only ever see the old tables or the new ones. Indexes and owned sequences move
+# along with their tables. The replaced relations are dropped without CASCADE, so
+# live views that depend on them but aren't staged stop the swap before anything
+# has moved, rather than being dropped along with them.
+def swap_staging_schema(engine):
+    kinds = {
+        "r": "TABLE",
+        "p": "TABLE",
+        "v": "VIEW",
+        "m": "MATERIALIZED VIEW",
+    }
+    with engine.begin() as conn:
+        relations = schema_relations(conn, STAGING_SCHEMA)
+        staged = {name for name, _ in relations}
+        blocking = sorted(
+            f"{dependent_schema}.{dependent} (on {LIVE_SCHEMA}.{referenced})"
+            for dependent_schema, dependent, referenced in view_dependencies(
+                conn, LIVE_SCHEMA
+            )
+            if referenced in staged
+            and (dependent_schema != LIVE_SCHEMA or dependent not in staged)
+        )
+        if blocking:
+            raise ValueError(
+                "views that aren't in the staging schema depend on relations it "
+                f"replaces: {', '.join(blocking)}"
+            )
+
+        conn.exec_driver_sql(f"DROP SCHEMA IF EXISTS {RETIRED_SCHEMA} CASCADE")
+        conn.exec_driver_sql(f"CREATE SCHEMA {RETIRED_SCHEMA}")
+        for name, kind in relations:
+            conn.exec_driver_sql(
+                f"ALTER {kinds[kind]} IF EXISTS {LIVE_SCHEMA}.{name} "
+                f"SET SCHEMA {RETIRED_SCHEMA}"
+            )
+        for name, kind in relations:
+            conn.exec_driver_sql(
+                f"ALTER {kinds[kind]} {STAGING_SCHEMA}.{name} SET SCHEMA {LIVE_SCHEMA}"
+            )
+
+        # Each view is dropped before the tables and views it reads from
+        retired = dict(schema_relations(conn, RETIRED_SCHEMA))
+        dependents = {name: set() for name in retired}
+        for schema, dependent, referenced in view_dependencies(conn, RETIRED_SCHEMA):
+            if schema == RETIRED_SCHEMA:
+                dependents[referenced].add(dependent)
+        for name in graphlib.TopologicalSorter(dependents).static_order():
+            conn.exec_driver_sql(
+                f"DROP {kinds[retired[name]]} IF EXISTS {RETIRED_SCHEMA}.{name}"
+            )
+        conn.exec_driver_sql(f"DROP SCHEMA {RETIRED_SCHEMA}")
+        conn.exec_driver_sql(f"DROP SCHEMA {STAGING_SCHEMA}")
+
+
+# Index definitions of a partitioned table, rewritten to build the same indexes on
+# a standalone table so ATTACH PARTITION adopts them instead of building its own
+def partition_index_sql(conn, table, partition):
+    index_rows = conn.exec_driver_sql(
+        f"""
+        SELECT pg_get_indexdef(i.indexrelid), pg_get_constraintdef(c.oid)
+        FROM pg_index AS i
+        LEFT JOIN pg_constraint AS c ON c.conindid = i.indexrelid
+        AND c.conrelid = i.indrelid
+        WHERE i.indrelid = '{LIVE_SCHEMA}.{table}'::regclass
+        """
+    ).all()
+    statements = []
+    for index_def, constraint_def in index_rows:
+        if constraint_def:
+            statements.append(f"ALTER TABLE {partition} ADD {constraint_def}")
+        else:
+            statements.append(
+                re.sub(
+                    r"^(CREATE (?:UNIQUE )?INDEX) \S+ ON (?:ONLY )?\S+ ",
+                    rf"\1 ON {partition} ",
+                    index_def,
+                )
+            )
+    return statements
+
+
+# Loads one year into a new table next to the live partitioned table, indexes it,
+# and then swaps it for that year's partition in a single short transaction, so
+# the other years are never rewritten or reindexed
+def replace_year_partition(engine, table, year, df):
+    partition = f"{LIVE_SCHEMA}.{table}_{year}"
+    loading = f"{table}_{year}_loading"
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"DROP TABLE IF EXISTS {LIVE_SCHEMA}.{loading}")
+        # The CHECK lets ATTACH PARTITION skip scanning the table
+        conn.exec_driver_sql(
+            f"CREATE TABLE {LIVE_SCHEMA}.{loading} "
+            f"(LIKE {LIVE_SCHEMA}.{table} INCLUDING DEFAULTS, CHECK (year = {year}))"
+        )
+
+    copy_frame(engine, loading, df, schema=LIVE_SCHEMA)
+
+    with engine.begin() as conn:
+        count = conn.exec_driver_sql(
+            f"SELECT count(*) FROM {LIVE_SCHEMA}.{loading}"
+        ).scalar()
+        if count == 0 or count != len(df):
+            raise ValueError(f"{loading} has {count} rows, expected {len(df)}")
+        for statement in partition_index_sql(conn, table, f"{LIVE_SCHEMA}.{loading}"):
+            conn.exec_driver_sql(statement)
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"DROP TABLE IF EXISTS {partition}")
+        conn.exec_driver_sql(
+            f"ALTER TABLE {LIVE_SCHEMA}.{loading} RENAME TO {table}_{year}"
+        )
+        # Index names are generated from the loading table, so give them the
+        # partition's name now that the old partition's indexes are gone
+        for (index,) in conn.exec_driver_sql(
+            f"SELECT indexname FROM pg_indexes WHERE schemaname = '{LIVE_SCHEMA}' "
+            f"AND tablename = '{table}_{year}'"
+        ).all():
+            conn.exec_driver_sql(
+                f"ALTER INDEX {LIVE_SCHEMA}.{index} "
+                f"RENAME TO {index.replace(loading, f'{table}_{year}', 1)}"
+            )
+        conn.exec_driver_sql(
+            f"ALTER TABLE {LIVE_SCHEMA}.{table} "
+            f"ATTACH PARTITION {partition} FOR VALUES IN ({year})"
+        )
@@ -0,0 +1,102 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Owners whose own_id or taxpayer names contain any of these are public or
+# institutional, and are left out of the own_id map and the parcel counts. Each
+# caller adds its own VHS term, see below.
+EXCLUDED_TERMS = [
+    "LAND BANK",
+    "CITY OF DETROIT",
+    "DETROIT PARKS",
+    "BRIDGE AUTHORITY",
+    "MDOT",
+    "DEPARTMENT OF",
+    "DEPT OF",
+    "UNK_",
+    "UNIDENTIFIED",
+    "UNKNOWN",
+    "TRUST",
+    "HENRY FORD",
+    "UAT",
+    "UAW",
+    "DTE",
+    "FCA",
+    "WAYNE COUNTY",
+    "NON-PROFIT",
+    "TAXPAYER",
+    "RECOVERYPARK",
+    "RECOVERY PARK",
+    "HARPER-HUTZEL",
+    "POPE FRANCIS",
+    "DETROIT MERCY",
+    "CATHEDRAL",
+    "PARISH",
+    "PERFECTING CHURCH",
+    " LDHA",
+    "OLYMPIA CONEY",
+]
+# Too short to search for, so only excluded when they're the whole taxpayer name
+EXCLUDED_TAXPAYERS = ["HUD"]
+
+# Public owners whose new parcels don't need to be coded by identify_ownership
+PUBLIC_TERMS = [
+    "LAND BANK",
+    "CITY OF DETROIT",
+    "DETROIT HOUSING COMMISSION",
+    "DETROIT WATER SEWERAGE",
+    "DETROIT FIRE",
+    "DETROIT PUBLIC",
+    "SCHOOLS",
+    "DETROIT PARKS",
+    "City of Detroit",
+    "BRIDGE AUTHORITY",
+    "MDOT",
+    "DEPARTMENT OF",
+    "DETROIT CITY AIRPORT",
+    "FANNIE MAE",
+    "BROWNFIELD",
+    "DEPT OF HOME",
+    "HOMELAND SECURITY",
+    "DEPT OF TRANS",
+    "RECREATION DEP",
+    "WAYNE COUNTY DPS",
+    "DOWNTOWN DEVELOPMENT AUTHORITY",
+    "WATER AUTHORITY",
+    "US POSTAL SERVICE",
+    "WAYNE STATE U",
+    "STATE OF MICHIGAN",
+]
+
+
+# One alternation of literal terms, which Arrow's RE2 engine matches in a single
+# pass over each value
+def terms_pattern(terms):
+    return "|".join(re.escape(term) for term in terms)
+
+
+# clean_files has always only excluded VHS Harper, while the own_id map leaves out
+# every VHS name
+CLEAN_EXCLUDED_PATTERN = terms_pattern([*EXCLUDED_TERMS, "VHS HARPER"])
+OWN_ID_MAP_EXCLUDED_PATTERN = terms_pattern([*EXCLUDED_TERMS, "VHS"])
+PUBLIC_PATTERN = terms_pattern(PUBLIC_TERMS)
+
+
+# Names repeat across parcels and years, so each distinct value is searched once
+# and the result is broadcast back by factorized codes. Nulls never match.
+def contains_any(series, pattern):
+    codes, uniques = pd.factorize(series)
+    found = (
+        pd.Series(uniques, dtype="string[pyarrow]")
+        .str.contains(pattern, regex=True)
+        .to_numpy(dtype=bool, na_value=False)
+    )
+    return pd.Series(np.append(found, False)[codes], index=series.index)
+
+
+def excluded_owners(df, columns, taxpayer_column, pattern):
+    excluded = df[taxpayer_column].isin(EXCLUDED_TAXPAYERS)
+    for col in columns:
+        excluded |= contains_any(df[col], pattern)
+    return excluded
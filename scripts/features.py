@@ -0,0 +1,35 @@
+import numpy as np
+import shapely
+
+# Decimal places kept in coordinates, 6 is about 10cm in EPSG:4326
+GEOJSON_PRECISION = 6
+FEATURE_CHUNK_SIZE = 100_000
+
+
+def geometry_json(geoms, precision):
+    geoms = shapely.transform(geoms, lambda coords: np.round(coords, precision))
+    geometry = shapely.to_geojson(geoms)
+    geometry[shapely.is_missing(geoms)] = "null"
+    return geometry
+
+
+# Writes one GeoJSON feature per line, so tippecanoe can split the file across
+# threads with --read-parallel. Properties are serialized by pandas and geometries
+# by GEOS, a chunk at a time, instead of feature by feature through GDAL.
+def write_ndjson(gdf, filename, precision=GEOJSON_PRECISION):
+    properties_df = gdf.drop(columns=[gdf.geometry.name])
+    geoms = gdf.geometry.to_numpy()
+    with open(filename, "w") as ndjson_file:
+        for start in range(0, len(gdf), FEATURE_CHUNK_SIZE):
+            end = start + FEATURE_CHUNK_SIZE
+            properties = (
+                properties_df.iloc[start:end]
+                .to_json(orient="records", lines=True, date_format="iso")
+                .split("\n")
+            )
+            ndjson_file.writelines(
+                f'{{"type":"Feature","properties":{props},"geometry":{geometry}}}\n'
+                for props, geometry in zip(
+                    properties, geometry_json(geoms[start:end], precision)
+                )
+            )
@@ -0,0 +1,80 @@
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from shapely import STRtree
+
+
+def _first_per_parcel(parcel_idx, zip_idx):
+    # parcel_idx is sorted, so the first occurrence of each parcel is its pick
+    _, first = np.unique(parcel_idx, return_index=True)
+    return parcel_idx[first], zip_idx[first]
+
+
+def add_zipcode_with_most_overlap(parcels_gdf, zips_gdf):
+    parcels = parcels_gdf.geometry.to_numpy()
+    zips = zips_gdf.geometry.to_numpy()
+    tree = STRtree(zips)
+    zip_idx = np.full(len(parcels), -1)
+
+    # Almost every parcel sits inside a single zip, which needs no geometry math
+    within = tree.query(parcels, predicate="within")
+    parcel_match, zip_match = _first_per_parcel(*within)
+    zip_idx[parcel_match] = zip_match
+
+    # Parcels that straddle a boundary go to the zip with the largest overlap
+    boundary = np.flatnonzero(zip_idx == -1)
+    parcel_pos, zip_pos = tree.query(parcels[boundary], predicate="intersects")
+    if len(parcel_pos):
+        parcel_pos = boundary[parcel_pos]
+        candidates = parcels[parcel_pos]
+        candidates = np.where(
+            shapely.is_valid(candidates), candidates, shapely.make_valid(candidates)
+        )
+        overlap = shapely.area(shapely.intersection(candidates, zips[zip_pos]))
+        order = np.lexsort((-overlap, parcel_pos))
+        parcel_match, zip_match = _first_per_parcel(parcel_pos[order], zip_pos[order])
+        zip_idx[parcel_match] = zip_match
+
+    # Unmatched parcels keep -1, which reindexes to a null zipcode
+    zipcodes = pd.Series(zips_gdf["zipcode"].to_numpy())
+    parcels_gdf = parcels_gdf.copy()
+    parcels_gdf["zipcode"] = zipcodes.reindex(zip_idx).to_numpy()
+    return parcels_gdf
+
+
+# Unions the geometries of rows that share a value of `by`, keeping the first
+# non-null value of every other column. Rows with a unique value, which is almost
+# all parcels, are passed through without touching their geometry.
+def dissolve(gdf, by):
+    gdf = gdf.sort_values(by, kind="stable").reset_index(drop=True)
+    shared = gdf[by].duplicated(keep=False).to_numpy()
+    if not shared.any():
+        return gdf
+
+    parts = gdf.loc[shared]
+    codes, _ = pd.factorize(parts[by], sort=True)
+    sizes = np.bincount(codes)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    part_geoms = parts.geometry.to_numpy()
+
+    # Groups are contiguous after sorting, so each group size can be unioned as
+    # one (groups, size) array of part indexes
+    geoms = np.empty(len(sizes), dtype=object)
+    for size in np.unique(sizes):
+        groups = np.flatnonzero(sizes == size)
+        part_idx = starts[groups][:, None] + np.arange(size)
+        geoms[groups] = shapely.union_all(part_geoms[part_idx], axis=1)
+
+    columns = [col for col in gdf.columns if col not in (by, gdf.geometry.name)]
+    merged = parts.groupby(by, sort=True)[columns].first().reset_index()
+    merged[gdf.geometry.name] = geoms
+    merged = gpd.GeoDataFrame(
+        merged[gdf.columns], geometry=gdf.geometry.name, crs=gdf.crs
+    )
+
+    return (
+        pd.concat([gdf.loc[~shared], merged])
+        .sort_values(by, kind="stable")
+        .reset_index(drop=True)
+    )
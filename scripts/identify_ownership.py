@@ -1,10 +1,20 @@
 import csv
 import os
-import re
+import sys
 
 import geopandas as gpd
-import numpy as np
 import pandas as pd
+from cache import hash_files, load_frame, save_frame, source_files
+from exclusions import PUBLIC_PATTERN, contains_any
+from normalize import (
+    clean_address_series,
+    clean_owner_series,
+    fix_parcelno_series,
+    load_cache,
+    parcel_key,
+    save_cache,
+)
+from owners import format_counts, resolve_own_ids
 
 INPUT_DIR = os.path.join(
     os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "input"
@@ -41,505 +51,122 @@ COL_MAP = {
     "Taxpayer State": "taxpayer_state",
     "Sale Date": "sale_date",
 }
-SPACE_RE = r"\s+"
-CLEAN_RE = r"(\.|,)"
-ADDR_SUFFIX_RE = r" (DR|DRIVE|AVE|AVENUE|ST|STREET|BLVD|BOULEVARD|FWY|FREEWAY)\.?$"
-LLC_RE = r" (LLC|INC|CO)\b"
-DETROIT_RE = r"LAND BANK|CITY OF DETROIT|DETROIT HOUSING COMMISSION|DETROIT WATER SEWERAGE|DETROIT FIRE|DETROIT PUBLIC|SCHOOLS|DETROIT PARKS|City of Detroit|BRIDGE AUTHORITY|MDOT|DEPARTMENT OF|DETROIT CITY AIRPORT|FANNIE MAE|BROWNFIELD|DEPT OF HOME|HOMELAND SECURITY|DEPT OF TRANS|RECREATION DEP|WAYNE COUNTY DPS|DOWNTOWN DEVELOPMENT AUTHORITY|WATER AUTHORITY|US POSTAL SERVICE|WAYNE STATE U|STATE OF MICHIGAN"  # noqa
-
-
-def clean_owner(owner):
-    if not isinstance(owner, str):
-        return ""
-    return re.sub(r"\s+", " ", re.sub(r"[^A-Za-z0-9 ]+", "", owner)).strip()
-
-
-def clean_dates(date_str):
-    if not isinstance(date_str, str):
-        return date_str
-    if "1900" in date_str:
-        return np.nan
-    try:
-        return pd.to_datetime(
-            date_str.split()[0],
-            format=("%m/%d/%Y" if ("/" in date_str) else "%Y-%m-%d"),
-        )
-    except Exception:
-        return np.nan
-
-
-def fix_parcelno(parcelno):
-    if not ("." in parcelno or "-" in parcelno):
-        parcelno = parcelno + "."
-    if len(parcelno.split(".")[0]) == 7 and "." in parcelno:
-        parcelno = "0" + parcelno
-    return parcelno
-
-
-def compare_21_20():
-    gdf_20 = gpd.read_file(
-        f"zip://{os.path.join(INPUT_DIR, 'praxis_shapefiles', 'praxis2020.shp.zip')}"
-    ).rename(columns=COL_MAP)[
-        [
-            "parcel_num",
-            "taxpayer1",
-            "taxpayer2",
-            "taxpayer_address",
-            "taxpayer_city",
-        ]
-    ]
-
-    own_df_20 = pd.read_csv(
-        os.path.join(INPUT_DIR, "praxis_csvs", "PPlusFinal_2020_edit.csv"),
-        dtype={"parcel_num": "str", "parcelno": "str"},
-    ).rename(columns=COL_MAP)[
-        [
-            "parcel_num",
-            "own_id",
-        ]
-    ]
-    gdf_20["parcel_num"] = gdf_20["parcel_num"].apply(fix_parcelno)
-    own_df_20["parcel_num"] = own_df_20["parcel_num"].apply(fix_parcelno)
-    own_df_20 = own_df_20[~pd.isnull(own_df_20["own_id"])].drop_duplicates(
-        subset=["parcel_num"]
-    )
-
-    gdf_20 = gdf_20.drop_duplicates(subset=["parcel_num"])
-    df_20 = gdf_20.merge(own_df_20, on="parcel_num", how="left")
 
-    df_20["taxpayer_address"] = (
-        df_20["taxpayer_address"]
-        .str.replace(SPACE_RE, " ", regex=True)
-        .str.strip()
-        .str.replace(CLEAN_RE, "", regex=True)
-        .str.replace(ADDR_SUFFIX_RE, "", regex=True)
-    )
-    df_20["taxpayer1"] = df_20["taxpayer1"].apply(clean_owner)
-    df_20["taxpayer2"] = df_20["taxpayer2"].apply(clean_owner)
 
-    own_df = pd.read_csv(os.path.join(INPUT_DIR, "own-id-map.csv"))
-    own_df["taxpayer1"] = own_df["taxpayer1"].apply(clean_owner)
-    own_df["taxpayer2"] = own_df["taxpayer2"].apply(clean_owner)
-    own_records = own_df.to_dict(orient="records")
-
-    own_id_map = {}
-    for r in own_records:
-        if not r["own_id"] or "UNID" in r["own_id"] or "UNK_" in r["own_id"]:
-            continue
-        if r["taxpayer1"] not in own_id_map:
-            own_id_map[r["taxpayer1"]] = r["own_id"]
-        if r["taxpayer2"] and r["taxpayer2"] not in own_id_map:
-            own_id_map[r["taxpayer2"]] = r["own_id"]
-
-    df_21 = pd.read_csv(
-        os.path.join(INPUT_DIR, "praxis_csvs", "PPlusFinal_2021_edit.csv"),
-        dtype={"parcel_num": "str"},
-    ).rename(columns=COL_MAP)[
-        [
-            "parcel_num",
-            "address",
-            "taxpayer1",
-            "taxpayer2",
-            "own_id",
-            "taxpayer_address",
-            "taxpayer_city",
-        ]
-    ]
-    df_21["taxpayer1"] = df_21["taxpayer1"].apply(clean_owner)
-    df_21["taxpayer2"] = df_21["taxpayer2"].apply(clean_owner)
-    df_21["parcel_num"] = df_21["parcel_num"].apply(fix_parcelno)
-    df_21.drop_duplicates(subset=["parcel_num"], inplace=True)
-    df_21["address"] = (
-        df_21["address"]
-        .str.replace(SPACE_RE, " ", regex=True)
-        .str.strip()
-        .str.replace(CLEAN_RE, "", regex=True)
-        .str.replace(ADDR_SUFFIX_RE, "", regex=True)
-    )
-    df_21["taxpayer_address"] = (
-        df_21["taxpayer_address"]
-        .str.replace(SPACE_RE, " ", regex=True)
-        .str.strip()
-        .str.replace(CLEAN_RE, "", regex=True)
-        .str.replace(ADDR_SUFFIX_RE, "", regex=True)
-    )
+# Where each year's city parcel data is read from, relative to INPUT_DIR. Years
+# that were already coded also get their own_ids from the cleaned CSV, and
+# map_taxpayer2 also looks up taxpayer2 names in the own_id map when that year is
+# the newer one in a comparison.
+SOURCES = {
+    2020: {
+        "parcels": os.path.join("praxis_shapefiles", "praxis2020.shp.zip"),
+        "own_ids": os.path.join("praxis_csvs", "PPlusFinal_2020_edit.csv"),
+    },
+    2021: {
+        "parcels": os.path.join("city", "parcels_2021.csv"),
+        "own_ids": os.path.join("praxis_csvs", "PPlusFinal_2021_edit.csv"),
+        "map_taxpayer2": True,
+    },
+    2022: {"parcels": os.path.join("city", "IPDS 2022", "det_20220000.shp")},
+    2023: {"parcels": os.path.join("city", "parcels_2023.csv")},
+    2024: {"parcels": os.path.join("city", "parcels_2024.csv")},
+    2025: {"parcels": os.path.join("city", "parcels_2025.csv")},
+}
 
-    to_merge_21_df = (
-        df_21[
-            [
-                "parcel_num",
-                "address",
-                "taxpayer1",
-                "taxpayer2",
-                "own_id",
-                "taxpayer_address",
-                "taxpayer_city",
-            ]
-        ]
-        .rename(
-            columns={
-                "taxpayer1": "taxpayer1_21",
-                "taxpayer2": "taxpayer2_21",
-                "own_id": "own_id_21",
-                "taxpayer_address": "taxpayer_address_21",
-                "taxpayer_city": "taxpayer_city_21",
-            }
+SNAPSHOT_COLS = [
+    "parcel_num",
+    "parcel_key",
+    "address",
+    "taxpayer1",
+    "taxpayer2",
+    "own_id",
+    "taxpayer_address",
+    "taxpayer_city",
+]
+# Columns kept from the year being compared against, with their names unchanged
+PREV_COLS = ["taxpayer1", "taxpayer2", "taxpayer_address", "taxpayer_city", "own_id"]
+
+# Bump whenever read_source or normalize_snapshot change what they return, so
+# cached snapshots are rebuilt
+SNAPSHOT_VERSION = 2
+
+
+def read_source(filename, columns):
+    if filename.endswith(".csv"):
+        return pd.read_csv(
+            filename, dtype=str, usecols=lambda col: COL_MAP.get(col, col) in columns
+        ).rename(columns=COL_MAP)
+    if filename.endswith(".zip"):
+        filename = f"zip://{filename}"
+    df = pd.DataFrame(gpd.read_file(filename, ignore_geometry=True)).rename(
+        columns=COL_MAP
+    )
+    return df[[col for col in df.columns if col in columns]]
+
+
+def parcel_numbers(df):
+    df["parcel_num"] = fix_parcelno_series(df["parcel_num"])
+    df["parcel_key"] = parcel_key(df["parcel_num"])
+    return df
+
+
+def normalize_snapshot(year):
+    source = SOURCES[year]
+    df = parcel_numbers(
+        read_source(os.path.join(INPUT_DIR, source["parcels"]), SNAPSHOT_COLS)
+    )
+    if "own_ids" in source:
+        own_df = parcel_numbers(
+            read_source(
+                os.path.join(INPUT_DIR, source["own_ids"]), ["parcel_num", "own_id"]
+            )
         )
-        .sort_values(by=["parcel_num", "own_id_21"], ascending=True)
-        .drop_duplicates(subset=["parcel_num"])
-    )
-    merge_df = to_merge_21_df.merge(df_20, on="parcel_num", how="left")
-
-    # Don't override own_id if exists already
-    def pull_own_id(d):
-        if (
-            d["own_id_21"]
-            and isinstance(d["own_id_21"], str)
-            and "UNK_" not in d["own_id_21"]
-        ):
-            return d["own_id_21"]
-        if d["taxpayer1_21"] in own_id_map:
-            return own_id_map[d["taxpayer1_21"]]
-        if d["taxpayer2_21"]:
-            # Try 2 if 1 not a match
-            return own_id_map.get(d["taxpayer2_21"])
-        return ""
-
-    merge_df["own_id_21"] = merge_df.apply(
-        pull_own_id,
-        axis=1,
-    )
-    merge_df["taxpayer_address_21"] = (
-        merge_df["taxpayer_address_21"]
-        .str.replace(SPACE_RE, " ", regex=True)
-        .str.strip()
-        .str.replace(CLEAN_RE, "", regex=True)
-        .str.replace(ADDR_SUFFIX_RE, "", regex=True)
-    )
-
-    changed_merge_df = merge_df[
-        (merge_df["taxpayer1"] != merge_df["taxpayer1_21"])
-        & (~merge_df["taxpayer1_21"].str.contains(DETROIT_RE))
-        & (merge_df["taxpayer1_21"] != "HUD")
-        & (merge_df["address"] != merge_df["taxpayer_address_21"])
-    ]
-    changed_merge_df["taxpayer1_21_count"] = changed_merge_df.groupby("taxpayer1_21")[
-        "taxpayer1_21"
-    ].transform("count")
-    changed_merge_df.sort_values(
-        by=["taxpayer1_21_count", "taxpayer1_21"], ascending=False, inplace=True
-    )
-    changed_merge_df.to_csv(
-        "owners-2021.csv", quoting=csv.QUOTE_NONNUMERIC, index=False
-    )
-
-
-def compare_22_21():
-    df_21 = pd.read_csv(
-        os.path.join(INPUT_DIR, "city", "parcels_2021.csv"),
-        dtype={"parcel_num": "str", "parcelno": "str"},
-    ).rename(columns=COL_MAP)[
-        [
-            "parcel_num",
-            "taxpayer1",
-            "taxpayer_address",
-            "taxpayer_city",
-        ]
-    ]
-    df_21["parcel_num"] = df_21["parcel_num"].apply(fix_parcelno)
-    df_21.drop_duplicates(subset=["parcel_num"], inplace=True)
-
-    own_df_21 = pd.read_csv(
-        os.path.join(INPUT_DIR, "praxis_csvs", "PPlusFinal_2021_edit.csv"),
-        dtype={"parcel_num": "str"},
-    ).rename(columns=COL_MAP)[
-        [
-            "parcel_num",
-            "own_id",
-        ]
-    ]
-    own_df_21["parcel_num"] = own_df_21["parcel_num"].apply(fix_parcelno)
-    own_df_21.drop_duplicates(subset=["parcel_num"], inplace=True)
-
-    df_21 = df_21.merge(own_df_21, on=["parcel_num"], how="left")
-
-    df_21["taxpayer_address"] = (
-        df_21["taxpayer_address"]
-        .str.replace(SPACE_RE, " ", regex=True)
-        .str.strip()
-        .str.replace(CLEAN_RE, "", regex=True)
-        .str.replace(ADDR_SUFFIX_RE, "", regex=True)
-    )
-    df_21["taxpayer1"] = df_21["taxpayer1"].apply(clean_owner)
-
-    own_df = pd.read_csv(os.path.join(INPUT_DIR, "own-id-map.csv"))
-    own_df["taxpayer1"] = own_df["taxpayer1"].apply(clean_owner)
-    own_df["taxpayer2"] = own_df["taxpayer2"].apply(clean_owner)
-    own_records = own_df.to_dict(orient="records")
-
-    own_id_map = {}
-    for r in own_records:
-        if not r["own_id"] or "UNID" in r["own_id"] or "UNK_" in r["own_id"]:
-            continue
-        if r["taxpayer1"] not in own_id_map:
-            own_id_map[r["taxpayer1"]] = r["own_id"]
-
-    gdf_22 = gpd.read_file(
-        os.path.join(INPUT_DIR, "city", "IPDS 2022", "det_20220000.shp")
-    ).rename(columns=COL_MAP)[
-        [
-            "parcel_num",
-            "address",
-            "taxpayer1",
-            "taxpayer2",
-            "taxpayer_address",
-            "taxpayer_city",
-        ]
-    ]
-    gdf_22["own_id"] = ""
-    gdf_22["taxpayer1"] = gdf_22["taxpayer1"].apply(clean_owner)
-    gdf_22["taxpayer2"] = gdf_22["taxpayer2"].apply(clean_owner)
-    gdf_22["parcel_num"] = gdf_22["parcel_num"].apply(fix_parcelno)
-    gdf_22.drop_duplicates(subset=["parcel_num"], inplace=True)
-    gdf_22["address"] = (
-        gdf_22["address"]
-        .str.replace(SPACE_RE, " ", regex=True)
-        .str.strip()
-        .str.replace(CLEAN_RE, "", regex=True)
-        .str.replace(ADDR_SUFFIX_RE, "", regex=True)
-    )
-    gdf_22["taxpayer_address"] = (
-        gdf_22["taxpayer_address"]
-        .str.replace(SPACE_RE, " ", regex=True)
-        .str.strip()
-        .str.replace(CLEAN_RE, "", regex=True)
-        .str.replace(ADDR_SUFFIX_RE, "", regex=True)
-    )
-
-    to_merge_22_df = (
-        gdf_22[
-            [
-                "parcel_num",
-                "address",
-                "taxpayer1",
-                "taxpayer2",
-                "own_id",
-                "taxpayer_address",
-                "taxpayer_city",
-            ]
-        ]
-        .rename(
-            columns={
-                "taxpayer1": "taxpayer1_22",
-                "taxpayer2": "taxpayer2_22",
-                "own_id": "own_id_22",
-                "taxpayer_address": "taxpayer_address_22",
-                "taxpayer_city": "taxpayer_city_22",
-            }
+        own_df = own_df[~pd.isnull(own_df["own_id"])].drop_duplicates(
+            subset=["parcel_key"]
         )
-        .sort_values(by=["parcel_num", "own_id_22"], ascending=True)
-        .drop_duplicates(subset=["parcel_num"])
-    )
-    merge_df = to_merge_22_df.merge(df_21, on="parcel_num", how="left")
-
-    # Don't override own_id if exists already
-    def pull_own_id(d):
-        if (
-            d["own_id_22"]
-            and isinstance(d["own_id_22"], str)
-            and "UNK_" not in d["own_id_22"]
-        ):
-            return d["own_id_22"]
-        if d["taxpayer1_22"] in own_id_map:
-            return own_id_map[d["taxpayer1_22"]]
-        if d["taxpayer2_22"]:
-            # Try 2 if 1 not a match
-            return own_id_map.get(d["taxpayer2_22"])
-        return ""
-
-    merge_df["own_id_22"] = merge_df.apply(
-        pull_own_id,
-        axis=1,
-    )
-    merge_df["taxpayer1_22"] = merge_df["taxpayer1_22"].fillna("")
-    merge_df["taxpayer_address_22"] = merge_df["taxpayer_address_22"].fillna("")
-
-    changed_merge_df = merge_df[
-        (merge_df["taxpayer1"] != merge_df["taxpayer1_22"])
-        & (~merge_df["taxpayer1_22"].str.contains(DETROIT_RE))
-        & (merge_df["taxpayer1_22"] != "HUD")
-        & (merge_df["address"] != merge_df["taxpayer_address_22"])
-    ]
-    changed_merge_df["taxpayer1_22_count"] = changed_merge_df.groupby("taxpayer1_22")[
-        "taxpayer1_22"
-    ].transform("count")
-    changed_merge_df.sort_values(
-        by=["taxpayer1_22_count", "taxpayer1_22"], ascending=False, inplace=True
-    )
-    changed_merge_df.to_csv(
-        "owners-2022.csv", quoting=csv.QUOTE_NONNUMERIC, index=False
-    )
-
-
-def compare_23_22():
-    gdf_22 = gpd.read_file(
-        os.path.join(INPUT_DIR, "city", "IPDS 2022", "det_20220000.shp")
-    ).rename(columns=COL_MAP)[
-        [
-            "parcel_num",
-            "taxpayer1",
-            "taxpayer2",
-            "taxpayer_address",
-            "taxpayer_city",
-        ]
-    ]
-    gdf_22["own_id"] = ""
-    gdf_22["parcel_num"] = gdf_22["parcel_num"].apply(fix_parcelno)
-    gdf_22.drop_duplicates(subset=["parcel_num"], inplace=True)
-    gdf_22["taxpayer1"] = gdf_22["taxpayer1"].apply(clean_owner)
-    gdf_22["taxpayer2"] = gdf_22["taxpayer2"].apply(clean_owner)
-    gdf_22["taxpayer_address"] = (
-        gdf_22["taxpayer_address"]
-        .str.replace(SPACE_RE, " ", regex=True)
-        .str.strip()
-        .str.replace(CLEAN_RE, "", regex=True)
-        .str.replace(ADDR_SUFFIX_RE, "", regex=True)
-    )
-
-    own_df = pd.read_csv(os.path.join(INPUT_DIR, "own-id-map.csv"))
-    own_df["taxpayer1"] = own_df["taxpayer1"].apply(clean_owner)
-    own_df["taxpayer2"] = own_df["taxpayer2"].apply(clean_owner)
-    own_records = own_df.to_dict(orient="records")
-
-    own_id_map = {}
-    for r in own_records:
-        if not r["own_id"] or "UNID" in r["own_id"] or "UNK_" in r["own_id"]:
-            continue
-        if r["taxpayer1"] not in own_id_map:
-            own_id_map[r["taxpayer1"]] = r["own_id"]
-
-    df_23 = pd.read_csv(
-        os.path.join(INPUT_DIR, "city", "parcels_2023.csv"), dtype={"pnum": "str"}
-    ).rename(columns=COL_MAP)[
-        [
-            "parcel_num",
-            "address",
-            "taxpayer1",
-            "taxpayer2",
-            "taxpayer_address",
-            "taxpayer_city",
-        ]
-    ]
-
-    df_23["own_id"] = ""
-    df_23["parcel_num"] = df_23["parcel_num"].apply(fix_parcelno)
-    df_23.drop_duplicates(subset=["parcel_num"], inplace=True)
-    df_23["address"] = (
-        df_23["address"]
-        .str.replace(SPACE_RE, " ", regex=True)
-        .str.strip()
-        .str.replace(CLEAN_RE, "", regex=True)
-        .str.replace(ADDR_SUFFIX_RE, "", regex=True)
-    )
-    df_23["taxpayer_address"] = (
-        df_23["taxpayer_address"]
-        .str.replace(SPACE_RE, " ", regex=True)
-        .str.strip()
-        .str.replace(CLEAN_RE, "", regex=True)
-        .str.replace(ADDR_SUFFIX_RE, "", regex=True)
-    )
-    df_23["taxpayer1"] = df_23["taxpayer1"].apply(clean_owner)
-    df_23["taxpayer2"] = df_23["taxpayer2"].apply(clean_owner)
-
-    to_merge_23_df = (
-        df_23[
-            [
-                "parcel_num",
-                "address",
-                "taxpayer1",
-                "taxpayer2",
-                "own_id",
-                "taxpayer_address",
-                "taxpayer_city",
-            ]
-        ]
-        .rename(
-            columns={
-                "taxpayer1": "taxpayer1_23",
-                "taxpayer2": "taxpayer2_23",
-                "own_id": "own_id_23",
-                "taxpayer_address": "taxpayer_address_23",
-                "taxpayer_city": "taxpayer_city_23",
-            }
+        df = df.drop(columns=["own_id"], errors="ignore").merge(
+            own_df.drop(columns=["parcel_num"]), on="parcel_key", how="left"
         )
-        .sort_values(by=["parcel_num", "own_id_23"], ascending=True)
-        .drop_duplicates(subset=["parcel_num"])
-    )
-    merge_df = to_merge_23_df.merge(gdf_22, on="parcel_num", how="left")
-
-    # Don't override own_id if exists already
-    def pull_own_id(d):
-        if d["taxpayer1_23"] in own_id_map:
-            return own_id_map[d["taxpayer1_23"]]
-        if d["taxpayer2_23"]:
-            # Try 2 if 1 not a match
-            return own_id_map.get(d["taxpayer2_23"])
-        return ""
-
-    merge_df["own_id_23"] = merge_df.apply(
-        pull_own_id,
-        axis=1,
-    )
-    merge_df["taxpayer1_23"] = merge_df["taxpayer1_23"].fillna("")
-    merge_df["taxpayer_address_23"] = merge_df["taxpayer_address_23"].fillna("")
-
-    changed_merge_df = merge_df[
-        (merge_df["taxpayer1"] != merge_df["taxpayer1_23"])
-        & (~merge_df["taxpayer1_23"].str.contains(DETROIT_RE))
-        & (merge_df["taxpayer1_23"] != "HUD")
-        & (merge_df["address"] != merge_df["taxpayer_address_23"])
-        & (merge_df["own_id_23"] == "")
+    for col in SNAPSHOT_COLS:
+        if col not in df.columns:
+            df[col] = None
+    df["own_id"] = df["own_id"].fillna("")
+
+    df["taxpayer1"] = clean_owner_series(df["taxpayer1"])
+    df["taxpayer2"] = clean_owner_series(df["taxpayer2"])
+    df["address"] = clean_address_series(df["address"])
+    df["taxpayer_address"] = clean_address_series(df["taxpayer_address"])
+    return (
+        df[SNAPSHOT_COLS]
+        .sort_values(by=["parcel_num", "own_id"])
+        .drop_duplicates(subset=["parcel_key"])
+        .reset_index(drop=True)
+    )
+
+
+# Each year is read and normalized once, and then loaded from the cache by every
+# comparison it's part of until its source files change
+def load_snapshot(year):
+    filenames = [
+        filename
+        for role in ["parcels", "own_ids"]
+        if role in SOURCES[year]
+        for filename in source_files(os.path.join(INPUT_DIR, SOURCES[year][role]))
     ]
-    changed_merge_df["taxpayer1_23_count"] = changed_merge_df.groupby("taxpayer1_23")[
-        "taxpayer1_23"
-    ].transform("count")
-    changed_merge_df.sort_values(
-        by=["taxpayer1_23_count", "taxpayer1_23"], ascending=False, inplace=True
-    )
-    changed_merge_df.to_csv(
-        "owners-2023.csv", quoting=csv.QUOTE_NONNUMERIC, index=False
-    )
-
+    name = f"ownership-{year}"
+    key = hash_files(filenames, SNAPSHOT_VERSION)
+    df = load_frame(name, key)
+    if df is None:
+        print(f"normalizing {year}")
+        df = normalize_snapshot(year)
+        save_frame(name, key, df)
+    return df
 
-def compare_24_23():
-    df_23 = pd.read_csv(
-        os.path.join(INPUT_DIR, "city", "parcels_2023.csv"), dtype={"pnum": "str"}
-    ).rename(columns=COL_MAP)[
-        [
-            "parcel_num",
-            "taxpayer1",
-            "taxpayer2",
-            "taxpayer_address",
-            "taxpayer_city",
-        ]
-    ]
-
-    df_23["own_id"] = ""
-    df_23["parcel_num"] = df_23["parcel_num"].apply(fix_parcelno)
-    df_23.drop_duplicates(subset=["parcel_num"], inplace=True)
-    df_23["taxpayer_address"] = (
-        df_23["taxpayer_address"]
-        .str.replace(SPACE_RE, " ", regex=True)
-        .str.strip()
-        .str.replace(CLEAN_RE, "", regex=True)
-        .str.replace(ADDR_SUFFIX_RE, "", regex=True)
-    )
-    df_23["taxpayer1"] = df_23["taxpayer1"].apply(clean_owner)
-    df_23["taxpayer2"] = df_23["taxpayer2"].apply(clean_owner)
 
+def load_own_id_map(taxpayer2=False):
     own_df = pd.read_csv(os.path.join(INPUT_DIR, "own-id-map.csv"))
-    own_df["taxpayer1"] = own_df["taxpayer1"].apply(clean_owner)
-    own_df["taxpayer2"] = own_df["taxpayer2"].apply(clean_owner)
+    own_df["taxpayer1"] = clean_owner_series(own_df["taxpayer1"])
+    own_df["taxpayer2"] = clean_owner_series(own_df["taxpayer2"])
     own_records = own_df.to_dict(orient="records")
 
     own_id_map = {}
@@ -548,237 +175,82 @@ def compare_24_23():
             continue
         if r["taxpayer1"] not in own_id_map:
             own_id_map[r["taxpayer1"]] = r["own_id"]
+        if taxpayer2 and r["taxpayer2"] and r["taxpayer2"] not in own_id_map:
+            own_id_map[r["taxpayer2"]] = r["own_id"]
+    return own_id_map
 
-    df_24 = pd.read_csv(
-        os.path.join(INPUT_DIR, "city", "parcels_2024.csv"),
-        dtype={"parcel_number": "str"},
-    ).rename(columns=COL_MAP)[
-        [
-            "parcel_num",
-            "address",
-            "taxpayer1",
-            "taxpayer2",
-            "taxpayer_address",
-            "taxpayer_city",
-        ]
-    ]
-    df_24["own_id"] = ""
-    df_24["parcel_num"] = df_24["parcel_num"].apply(fix_parcelno)
-    df_24.drop_duplicates(subset=["parcel_num"], inplace=True)
-    df_24["address"] = (
-        df_24["address"]
-        .str.replace(SPACE_RE, " ", regex=True)
-        .str.strip()
-        .str.replace(CLEAN_RE, "", regex=True)
-        .str.replace(ADDR_SUFFIX_RE, "", regex=True)
-    )
-    df_24["taxpayer_address"] = (
-        df_24["taxpayer_address"]
-        .str.replace(SPACE_RE, " ", regex=True)
-        .str.strip()
-        .str.replace(CLEAN_RE, "", regex=True)
-        .str.replace(ADDR_SUFFIX_RE, "", regex=True)
-    )
-    df_24["taxpayer1"] = df_24["taxpayer1"].apply(clean_owner)
-    df_24["taxpayer2"] = df_24["taxpayer2"].apply(clean_owner)
-
-    to_merge_24_df = (
-        df_24[
-            [
-                "parcel_num",
-                "address",
-                "taxpayer1",
-                "taxpayer2",
-                "own_id",
-                "taxpayer_address",
-                "taxpayer_city",
-            ]
-        ]
-        .rename(
-            columns={
-                "taxpayer1": "taxpayer1_24",
-                "taxpayer2": "taxpayer2_24",
-                "own_id": "own_id_24",
-                "taxpayer_address": "taxpayer_address_24",
-                "taxpayer_city": "taxpayer_city_24",
-            }
-        )
-        .sort_values(by=["parcel_num", "own_id_24"], ascending=True)
-        .drop_duplicates(subset=["parcel_num"])
-    )
-    merge_df = to_merge_24_df.merge(df_23, on="parcel_num", how="left")
-
-    # Don't override own_id if exists already
-    def pull_own_id(d):
-        if d["taxpayer1_24"] in own_id_map:
-            return own_id_map[d["taxpayer1_24"]]
-        if d["taxpayer2_24"]:
-            # Try 2 if 1 not a match
-            return own_id_map.get(d["taxpayer2_24"])
-        return ""
-
-    merge_df["own_id_24"] = merge_df.apply(
-        pull_own_id,
-        axis=1,
-    )
-    merge_df["taxpayer1_24"] = merge_df["taxpayer1_24"].fillna("")
-    merge_df["taxpayer_address_24"] = merge_df["taxpayer_address_24"].fillna("")
 
-    changed_merge_df = merge_df[
-        (merge_df["taxpayer1"] != merge_df["taxpayer1_24"])
-        & (~merge_df["taxpayer1_24"].str.contains(DETROIT_RE))
-        & (merge_df["taxpayer1_24"] != "HUD")
-        & (merge_df["address"] != merge_df["taxpayer_address_24"])
-        & (merge_df["own_id_24"] == "")
-    ]
-    changed_merge_df["taxpayer1_24_count"] = changed_merge_df.groupby("taxpayer1_24")[
-        "taxpayer1_24"
-    ].transform("count")
-    changed_merge_df.sort_values(
-        by=["taxpayer1_24_count", "taxpayer1_24"], ascending=False, inplace=True
+# Parcels in cur whose taxpayer changed since prev, that aren't public, owner
+# occupied or already coded, with the busiest new taxpayers first
+def compare_years(prev, cur, own_id_map):
+    suffix = f"_{cur % 100:02d}"
+    cur_df = load_snapshot(cur).rename(
+        columns={col: f"{col}{suffix}" for col in PREV_COLS}
     )
-    changed_merge_df.to_csv(
-        "owners-2024.csv", quoting=csv.QUOTE_NONNUMERIC, index=False
+    merge_df = cur_df.merge(
+        load_snapshot(prev)[["parcel_key", *PREV_COLS]], on="parcel_key", how="left"
     )
 
-
-def compare_25_24():
-    df_24 = pd.read_csv(
-        os.path.join(INPUT_DIR, "city", "parcels_2024.csv"),
-        dtype={"parcel_number": "str"},
-    ).rename(columns=COL_MAP)[
+    # Don't override own_id if exists already, then try taxpayer 2 if 1 not a match
+    own_ids, counts = resolve_own_ids(
+        own_id_map,
         [
-            "parcel_num",
-            "taxpayer1",
-            "taxpayer2",
-            "taxpayer_address",
-            "taxpayer_city",
-        ]
-    ]
-    df_24["own_id"] = ""
-    df_24["parcel_num"] = df_24["parcel_num"].apply(fix_parcelno)
-    df_24.drop_duplicates(subset=["parcel_num"], inplace=True)
-    df_24["taxpayer_address"] = (
-        df_24["taxpayer_address"]
-        .str.replace(SPACE_RE, " ", regex=True)
-        .str.strip()
-        .str.replace(CLEAN_RE, "", regex=True)
-        .str.replace(ADDR_SUFFIX_RE, "", regex=True)
-    )
-    df_24["taxpayer1"] = df_24["taxpayer1"].apply(clean_owner)
-    df_24["taxpayer2"] = df_24["taxpayer2"].apply(clean_owner)
-
-    own_df = pd.read_csv(os.path.join(INPUT_DIR, "own-id-map.csv"))
-    own_df["taxpayer1"] = own_df["taxpayer1"].apply(clean_owner)
-    own_df["taxpayer2"] = own_df["taxpayer2"].apply(clean_owner)
-    own_records = own_df.to_dict(orient="records")
-
-    own_id_map = {}
-    for r in own_records:
-        if not r["own_id"] or "UNID" in r["own_id"] or "UNK_" in r["own_id"]:
-            continue
-        if r["taxpayer1"] not in own_id_map:
-            own_id_map[r["taxpayer1"]] = r["own_id"]
-
-    df_25 = pd.read_csv(
-        os.path.join(INPUT_DIR, "city", "parcels_2025.csv"),
-        dtype={"Parcel ID": "str"},
-    ).rename(columns=COL_MAP)[
-        [
-            "parcel_num",
-            "address",
-            "taxpayer1",
-            "taxpayer2",
-            "taxpayer_address",
-            "taxpayer_city",
-        ]
-    ]
-    df_25["own_id"] = ""
-    df_25["parcel_num"] = df_25["parcel_num"].apply(fix_parcelno)
-    df_25.drop_duplicates(subset=["parcel_num"], inplace=True)
-    df_25["address"] = (
-        df_25["address"]
-        .str.replace(SPACE_RE, " ", regex=True)
-        .str.strip()
-        .str.replace(CLEAN_RE, "", regex=True)
-        .str.replace(ADDR_SUFFIX_RE, "", regex=True)
-    )
-    df_25["taxpayer_address"] = (
-        df_25["taxpayer_address"]
-        .str.replace(SPACE_RE, " ", regex=True)
-        .str.strip()
-        .str.replace(CLEAN_RE, "", regex=True)
-        .str.replace(ADDR_SUFFIX_RE, "", regex=True)
-    )
-    df_25["taxpayer1"] = df_25["taxpayer1"].apply(clean_owner)
-    df_25["taxpayer2"] = df_25["taxpayer2"].apply(clean_owner)
-
-    to_merge_25_df = (
-        df_25[
-            [
-                "parcel_num",
-                "address",
-                "taxpayer1",
-                "taxpayer2",
-                "own_id",
-                "taxpayer_address",
-                "taxpayer_city",
-            ]
-        ]
-        .rename(
-            columns={
-                "taxpayer1": "taxpayer1_25",
-                "taxpayer2": "taxpayer2_25",
-                "own_id": "own_id_25",
-                "taxpayer_address": "taxpayer_address_25",
-                "taxpayer_city": "taxpayer_city_25",
-            }
-        )
-        .sort_values(by=["parcel_num", "own_id_25"], ascending=True)
-        .drop_duplicates(subset=["parcel_num"])
-    )
-    merge_df = to_merge_25_df.merge(df_24, on="parcel_num", how="left")
-
-    # Don't override own_id if exists already
-    def pull_own_id(d):
-        if d["taxpayer1_25"] in own_id_map:
-            return own_id_map[d["taxpayer1_25"]]
-        if d["taxpayer2_25"]:
-            # Try 2 if 1 not a match
-            return own_id_map.get(d["taxpayer2_25"])
-        return ""
-
-    merge_df["own_id_25"] = merge_df.apply(
-        pull_own_id,
-        axis=1,
-    )
-    merge_df["taxpayer1_25"] = merge_df["taxpayer1_25"].fillna("")
-    merge_df["taxpayer_address_25"] = merge_df["taxpayer_address_25"].fillna("")
+            ("taxpayer1", merge_df[f"taxpayer1{suffix}"]),
+            ("taxpayer2", merge_df[f"taxpayer2{suffix}"]),
+        ],
+        existing=merge_df[f"own_id{suffix}"],
+    )
+    merge_df[f"own_id{suffix}"] = own_ids.fillna("")
+    print(f"{cur} own_ids: {format_counts(counts)}")
+    merge_df[f"taxpayer1{suffix}"] = merge_df[f"taxpayer1{suffix}"].fillna("")
+    merge_df[f"taxpayer_address{suffix}"] = merge_df[
+        f"taxpayer_address{suffix}"
+    ].fillna("")
 
     changed_merge_df = merge_df[
-        (merge_df["taxpayer1"] != merge_df["taxpayer1_25"])
-        & (~merge_df["taxpayer1_25"].str.contains(DETROIT_RE))
-        & (merge_df["taxpayer1_25"] != "HUD")
-        & (merge_df["address"] != merge_df["taxpayer_address_25"])
-        & (merge_df["own_id_25"] == "")
-    ]
-    changed_merge_df["taxpayer1_25_count"] = changed_merge_df.groupby("taxpayer1_25")[
-        "taxpayer1_25"
-    ].transform("count")
+        (merge_df["taxpayer1"] != merge_df[f"taxpayer1{suffix}"])
+        & (~contains_any(merge_df[f"taxpayer1{suffix}"], PUBLIC_PATTERN))
+        & (merge_df[f"taxpayer1{suffix}"] != "HUD")
+        & (merge_df["address"] != merge_df[f"taxpayer_address{suffix}"])
+        & (merge_df[f"own_id{suffix}"] == "")
+    ].copy()
+    changed_merge_df[f"taxpayer1{suffix}_count"] = changed_merge_df.groupby(
+        f"taxpayer1{suffix}"
+    )[f"taxpayer1{suffix}"].transform("count")
     changed_merge_df.sort_values(
-        by=["taxpayer1_25_count", "taxpayer1_25"], ascending=False, inplace=True
+        by=[f"taxpayer1{suffix}_count", f"taxpayer1{suffix}"],
+        ascending=False,
+        inplace=True,
     )
-    changed_merge_df.to_csv(
-        "owners-2025.csv", quoting=csv.QUOTE_NONNUMERIC, index=False
+    filename = os.path.join(DATA_DIR, f"owners-{cur}.csv")
+    os.makedirs(DATA_DIR, exist_ok=True)
+    changed_merge_df.drop(columns=["parcel_key"]).to_csv(
+        filename, quoting=csv.QUOTE_NONNUMERIC, index=False
     )
+    print(f"{filename}: {len(changed_merge_df)} parcels to code")
 
 
+# With no arguments the latest year is compared to the one before it. Pass two
+# years to compare them, or "all" for every consecutive pair of SOURCES.
 def main():
-    # compare_21_20()
-    # compare_22_21()
-    # compare_23_22()
-    # compare_24_23()
-    compare_25_24()
+    years = sorted(SOURCES)
+    if sys.argv[1:] == ["all"]:
+        pairs = list(zip(years, years[1:]))
+    elif len(sys.argv) == 3:
+        pairs = [(int(sys.argv[1]), int(sys.argv[2]))]
+    else:
+        pairs = [(years[-2], years[-1])]
+
+    load_cache("owner")
+    load_cache("address")
+    own_id_maps = {}
+    for prev, cur in pairs:
+        taxpayer2 = SOURCES[cur].get("map_taxpayer2", False)
+        if taxpayer2 not in own_id_maps:
+            own_id_maps[taxpayer2] = load_own_id_map(taxpayer2)
+        compare_years(prev, cur, own_id_maps[taxpayer2])
+    save_cache("owner")
+    save_cache("address")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,211 @@
+import os
+
+import numpy as np
+import pandas as pd
+from cache import CACHE_DIR
+
+OWNER_STRIP_RE = r"[^A-Za-z0-9 ]+"
+SPACE_RE = r"\s+"
+ADDRESS_STRIP_RE = r"[.,]"
+
+# Spelled out directionals, replaced as whole words
+DIRECTIONALS = {
+    "NORTHEAST": "NE",
+    "NORTHWEST": "NW",
+    "SOUTHEAST": "SE",
+    "SOUTHWEST": "SW",
+    "NORTH": "N",
+    "SOUTH": "S",
+    "EAST": "E",
+    "WEST": "W",
+}
+# Street suffixes, dropped from the end of an address along with any directional
+# after them, so "100 E JEFFERSON AVENUE" and "100 East Jefferson" compare equal
+STREET_SUFFIXES = [
+    "ALLEY",
+    "ALY",
+    "AV",
+    "AVE",
+    "AVENUE",
+    "BLVD",
+    "BOULEVARD",
+    "CIR",
+    "CIRCLE",
+    "CT",
+    "COURT",
+    "DR",
+    "DRIVE",
+    "EXPRESSWAY",
+    "EXPY",
+    "FREEWAY",
+    "FWY",
+    "HIGHWAY",
+    "HWY",
+    "LANE",
+    "LN",
+    "PARKWAY",
+    "PKWY",
+    "PL",
+    "PLACE",
+    "PLAZA",
+    "PLZ",
+    "RD",
+    "ROAD",
+    "SQ",
+    "SQUARE",
+    "ST",
+    "STREET",
+    "TER",
+    "TERRACE",
+    "TRL",
+    "TRAIL",
+]
+STREET_SUFFIX_RE = (
+    rf" (?:{'|'.join(STREET_SUFFIXES)})" rf"( (?:{'|'.join(DIRECTIONALS.values())}))?$"
+)
+
+# Date formats seen in sale date columns, tried in order against each value
+DATE_FORMATS = [
+    # Sale dates from the city's ArcGIS exports, starting in 2025
+    (r"^[A-Za-z]{3}, ", "%a, %d %b %Y %H:%M:%S %Z"),
+    (r"/", "%m/%d/%Y"),
+    (r"", "%Y-%m-%d"),
+]
+
+# Bump a version whenever its normalization rules change so stale on-disk
+# mappings are ignored instead of silently reused
+CACHE_VERSIONS = {
+    "owner": 1,
+    "address": 1,
+}
+
+# In-memory raw -> clean mappings, shared by every call in the process
+_caches = {name: {} for name in CACHE_VERSIONS}
+
+
+def _clean_owner_values(values):
+    return (
+        values.str.replace(OWNER_STRIP_RE, "", regex=True)
+        .str.replace(SPACE_RE, " ", regex=True)
+        .str.strip()
+    )
+
+
+def _clean_address_values(values):
+    values = (
+        values.astype("string[pyarrow]")
+        .str.upper()
+        .str.replace(ADDRESS_STRIP_RE, "", regex=True)
+        .str.replace(SPACE_RE, " ", regex=True)
+        .str.strip()
+    )
+    for word, abbreviation in DIRECTIONALS.items():
+        values = values.str.replace(rf"\b{word}\b", abbreviation, regex=True)
+    return values.str.replace(STREET_SUFFIX_RE, r"\1", regex=True).astype(object)
+
+
+def cache_path(name):
+    return os.path.join(CACHE_DIR, f"{name}-v{CACHE_VERSIONS[name]}.csv")
+
+
+def load_cache(name):
+    if not CACHE_DIR or not os.path.exists(cache_path(name)):
+        return
+    cache_df = pd.read_csv(
+        cache_path(name), dtype=str, keep_default_na=False, na_filter=False
+    )
+    _caches[name].update(zip(cache_df["raw"], cache_df["clean"]))
+
+
+def save_cache(name):
+    if not CACHE_DIR:
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    cache = _caches[name]
+    pd.DataFrame({"raw": list(cache.keys()), "clean": list(cache.values())}).to_csv(
+        cache_path(name), index=False
+    )
+
+
+# Normalizes each distinct value once with the vectorized clean_values function
+# and broadcasts the results back by factorized codes. Nulls and non-string
+# values become fill.
+def normalize_unique(series, name, clean_values, fill=""):
+    cache = _caches[name]
+    codes, uniques = pd.factorize(series)
+    uniques = pd.Series(uniques, dtype=object)
+
+    cleaned = uniques.map(cache).astype(object)
+    is_str = uniques.map(lambda value: isinstance(value, str)).astype(bool)
+    missing = cleaned.isna() & is_str
+    if missing.any():
+        new_values = clean_values(uniques[missing].astype(str))
+        cleaned[missing] = new_values
+        cache.update(zip(uniques[missing], new_values))
+    cleaned = cleaned.where(is_str, fill)
+
+    # Code -1 marks nulls, which index the trailing fill value
+    lookup = np.append(cleaned.to_numpy(dtype=object), fill)
+    return pd.Series(lookup[codes], index=series.index, name=series.name)
+
+
+def clean_owner_series(series):
+    return normalize_unique(series, "owner", _clean_owner_values)
+
+
+# Nulls stay null, so a missing address never matches another missing address
+def clean_address_series(series):
+    return normalize_unique(series, "address", _clean_address_values, fill=None)
+
+
+def fix_parcelno_series(series):
+    parcelno = series.astype(object)
+    no_sep = ~(
+        parcelno.str.contains(".", regex=False, na=True)
+        | parcelno.str.contains("-", regex=False, na=True)
+    )
+    parcelno = parcelno.where(~no_sep, parcelno + ".")
+    # The first "." sits at the length of the prefix, -1 when there isn't one
+    pad = parcelno.str.find(".") == 7
+    return parcelno.where(~pad, "0" + parcelno)
+
+
+# Stable 64-bit hash of the canonical parcel number so merges and de-duplication
+# compare integers instead of strings. Nulls share one key, like pandas merges.
+def parcel_key(series):
+    return pd.Series(
+        pd.util.hash_array(series.to_numpy(dtype=object)).view("int64"),
+        index=series.index,
+        name="parcel_key",
+    )
+
+
+def parse_sale_dates(series):
+    codes, uniques = pd.factorize(series)
+    uniques = pd.Series(uniques, dtype=object)
+    parsed = pd.Series(pd.NaT, index=uniques.index, dtype="datetime64[ns]")
+
+    is_str = uniques.map(lambda value: isinstance(value, str)).astype(bool)
+    if (~is_str).any():
+        parsed[~is_str] = pd.to_datetime(
+            uniques[~is_str], errors="coerce", utc=True
+        ).dt.tz_localize(None)
+
+    # Any 1900 date is a placeholder for a missing sale
+    strings = uniques[is_str].astype(str)
+    strings = strings[~strings.str.contains("1900", regex=False)]
+    for pattern, date_format in DATE_FORMATS:
+        group = strings[strings.str.contains(pattern, regex=True)]
+        if group.empty:
+            continue
+        if "%H" not in date_format:
+            # Ignore any trailing time on date-only formats
+            group = group.str.split(n=1).str[0]
+        dates = pd.to_datetime(group, format=date_format, errors="coerce")
+        if dates.dt.tz is not None:
+            dates = dates.dt.tz_localize(None)
+        parsed[group.index] = dates.dt.normalize()
+        strings = strings.drop(group.index)
+
+    lookup = np.append(parsed.to_numpy(), np.datetime64("NaT", "ns"))
+    return pd.Series(lookup[codes], index=series.index, name=series.name)
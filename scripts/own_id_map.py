@@ -2,6 +2,7 @@ import os
 import re
 
 import pandas as pd
+from exclusions import OWN_ID_MAP_EXCLUDED_PATTERN, excluded_owners
 
 years = [2015, 2016, 2017, 2018, 2019, 2020]
 INPUT_DIR = os.path.join(
@@ -16,8 +17,6 @@ COL_MAP = {
 
 SPACE_RE = r"\s+"
 CLEAN_RE = r"(\.|,)"
-EXCLUDE_TAXPAYER_LIST = ["HUD"]
-EXCLUDE_RE = r"LAND BANK|CITY OF DETROIT|DETROIT PARKS|BRIDGE AUTHORITY|MDOT|DEPARTMENT OF|DEPT OF|UNK_|UNIDENTIFIED|UNKNOWN|TRUST|HENRY FORD|UAT|UAW|DTE|FCA|WAYNE COUNTY|NON\-PROFIT|TAXPAYER|RECOVERYPARK|RECOVERY PARK|VHS|HARPER\-HUTZEL|POPE FRANCIS|DETROIT MERCY|CATHEDRAL|PARISH|PERFECTING CHURCH| LDHA|OLYMPIA CONEY"  # noqa
 
 
 def clean_own_id(own_id):
@@ -75,12 +74,11 @@ if __name__ == "__main__":
         else x["own_id"],
         axis=1,
     )
-    df = df[
-        ~(
-            df.own_id.str.contains(EXCLUDE_RE, regex=True)
-            | df.taxpayer1.str.contains(EXCLUDE_RE, regex=True)
-            | df.taxpayer2.str.contains(EXCLUDE_RE, regex=True)
-            | df.taxpayer1.isin(EXCLUDE_TAXPAYER_LIST)
-        )
-    ]
+    excluded = excluded_owners(
+        df,
+        ["own_id", "taxpayer1", "taxpayer2"],
+        "taxpayer1",
+        OWN_ID_MAP_EXCLUDED_PATTERN,
+    )
+    df = df[~excluded]
     df.to_csv(os.path.join(INPUT_DIR, "own-id-map.csv"), index=False)
@@ -0,0 +1,32 @@
+import pandas as pd
+
+
+# Existing own_ids to keep, blanks and UNK_ placeholders are looked up again
+def has_own_id(own_ids):
+    own_ids = own_ids.astype(object).fillna("")
+    return (own_ids != "") & ~own_ids.str.contains("UNK_", regex=False)
+
+
+# Resolves an own_id for each row by trying rules in order, each only filling the
+# rows earlier rules left unresolved. An existing own_id comes first when given,
+# then each (rule, names) lookup in own_id_map. Blank and null names never match.
+# Returns the own_ids, null where nothing matched, and the rows each rule resolved.
+def resolve_own_ids(own_id_map, lookups, existing=None):
+    own_ids = pd.Series(None, index=lookups[0][1].index, dtype=object)
+    counts = {}
+    if existing is not None:
+        keep = has_own_id(existing)
+        own_ids = existing.astype(object).where(keep)
+        counts["existing"] = int(keep.sum())
+
+    for rule, names in lookups:
+        todo = own_ids.isna() & (names.astype(object).fillna("") != "")
+        found = names.astype(object).where(todo).map(own_id_map).where(todo)
+        own_ids = own_ids.where(~todo, found)
+        counts[rule] = int(found.notna().sum())
+    counts["unresolved"] = int(own_ids.isna().sum())
+    return own_ids, counts
+
+
+def format_counts(counts):
+    return ", ".join(f"{rule} {count}" for rule, count in counts.items())
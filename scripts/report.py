@@ -0,0 +1,120 @@
+import json
+import os
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+REPORT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "reports"
+)
+
+METRICS = ["wall_s", "cpu_s", "peak_rss_mb", "peak_rss_delta_mb", "rows_in", "rows_out"]
+
+# Stage records for this process, in the order the stages finished
+_records = []
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# Includes worker processes once they've exited
+def cpu_seconds():
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+# Records wall time, CPU time and how much the peak RSS grew while the block ran.
+# Row counts and any other details are set on the yielded record.
+@contextmanager
+def stage(name, year=None, rows_in=None, **fields):
+    record = {"stage": name, "year": year, **fields, "rows_in": rows_in}
+    start_peak = peak_rss_mb()
+    start_cpu = cpu_seconds()
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException:
+        record["failed"] = True
+        raise
+    finally:
+        record["wall_s"] = round(time.perf_counter() - start, 3)
+        record["cpu_s"] = round(cpu_seconds() - start_cpu, 3)
+        record["peak_rss_mb"] = round(peak_rss_mb())
+        record["peak_rss_delta_mb"] = round(peak_rss_mb() - start_peak)
+        record.setdefault("rows_out", None)
+        _records.append(record)
+
+
+# Runs func in a worker process and returns its result along with the records it
+# added, so the parent can include them with add_records
+def with_records(func, *args):
+    start = len(_records)
+    result = func(*args)
+    return result, _records[start:]
+
+
+def add_records(records):
+    _records.extend(records)
+
+
+def write_report(filename, settings):
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open(filename, "w") as report_file:
+        json.dump(
+            {
+                "finished": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "settings": settings,
+                "peak_rss_mb": round(peak_rss_mb()),
+                "stages": _records,
+            },
+            report_file,
+            indent=2,
+        )
+    print(f"wrote run report to {filename}")
+
+
+# Sums the records for each stage, so repeated stages line up between runs
+def stage_totals(records):
+    totals = {}
+    for record in records:
+        key = (record["stage"], record["year"], record.get("output"))
+        total = totals.setdefault(key, dict.fromkeys(METRICS, 0))
+        for metric in METRICS:
+            if metric == "peak_rss_mb":
+                total[metric] = max(total[metric], record[metric] or 0)
+            else:
+                total[metric] += record[metric] or 0
+    return totals
+
+
+def compare_reports(old_filename, new_filename):
+    with open(old_filename) as old_file, open(new_filename) as new_file:
+        old = stage_totals(json.load(old_file)["stages"])
+        new = stage_totals(json.load(new_file)["stages"])
+
+    print(f"{'stage':<44} {'old s':>9} {'new s':>9} {'change':>8} {'rows':>12}")
+    for key in list(old) + [key for key in new if key not in old]:
+        label = " ".join(str(part) for part in key if part is not None)
+        old_wall = old[key]["wall_s"] if key in old else None
+        new_wall = new[key]["wall_s"] if key in new else None
+        change = ""
+        if old_wall and new_wall is not None:
+            change = f"{(new_wall - old_wall) / old_wall:+.0%}"
+        rows = ""
+        if key in old and key in new and old[key]["rows_out"] != new[key]["rows_out"]:
+            rows = f"{old[key]['rows_out']}->{new[key]['rows_out']}"
+        print(
+            f"{label:<44} "
+            f"{'-' if old_wall is None else f'{old_wall:.2f}':>9} "
+            f"{'-' if new_wall is None else f'{new_wall:.2f}':>9} "
+            f"{change:>8} {rows:>12}"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python scripts/report.py OLD_REPORT NEW_REPORT")
+    compare_reports(sys.argv[1], sys.argv[2])
@@ -0,0 +1,384 @@
+import os
+import sys
+import tempfile
+import zipfile
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+# Rough extent of Detroit in EPSG:4326
+BOUNDS = (-83.29, 42.25, -82.91, 42.45)
+ZIP_COUNT = 30
+
+# Taxpayers that own a large share of the city and are excluded from the output
+PUBLIC_OWNERS = [
+    "DETROIT LAND BANK AUTHORITY",
+    "CITY OF DETROIT-P&DD",
+    "HUD",
+    "WAYNE COUNTY TREASURER",
+]
+PUBLIC_SHARE = 0.25
+
+OWNER_WORDS = ["MAPLE", "RIVER", "GREAT LAKES", "MOTOR CITY", "CORKTOWN", "EASTSIDE"]
+OWNER_KINDS = ["HOLDINGS", "PROPERTIES", "INVESTMENTS", "HOMES", "REALTY", "GROUP"]
+OWNER_SUFFIXES = [" LLC", ", LLC", " L.L.C.", " INC", " INC.", ""]
+STREETS = ["GRAND RIVER AVE", "GRATIOT AVE", "MACK AVE", "LIVERNOIS", "W WARREN AVE"]
+
+# Share of parcels that are split or replaced, and that change hands, each year
+PARCEL_TURNOVER = 0.02
+OWNER_TURNOVER = 0.05
+
+# Column names used by the cleaned CSVs over the years, from the first year each
+# set was used, named as the keys of COL_MAP and ZIP_COL_MAP in clean_files
+CSV_COLUMNS = {
+    2015: {
+        "parcelno": "parcelnumber",
+        "taxpayer": "taxpayer1",
+        "taxpayer2": "taxpayer 2",
+        "propaddr": "propaddr",
+        "tpaddr": "tpaddr",
+        "tpcity": "tpcity",
+        "tpstate": "tpstate",
+        "tpzip": "tpzip",
+        "propzip": "propzip",
+        "saledate": "saledate",
+        "saleprice": "saleprice",
+        "totsqft": "totalsquarefootage",
+        "totacres": "totacres",
+        "resyrbuilt": "yearbuilt",
+        "taxstatus": "taxstatus",
+        "propno": "propno",
+        "propdir": "propdir",
+        "propstr": "propstr",
+    },
+    2017: {
+        "parcelno": "parcelno",
+        "taxpayer": "taxpayer_1",
+        "taxpayer2": "taxpayer_2",
+        "propaddr": "propaddr",
+        "tpaddr": "taxpayerstreet",
+        "tpcity": "taxpayercity",
+        "tpstate": "taxpayerstate",
+        "tpzip": "taxpayerzip",
+        "propzip": "propzip",
+        "saledate": "sale_date",
+        "saleprice": "sale_price",
+        "totsqft": "totsqft",
+        "totacres": "totacres",
+        "resyrbuilt": "resyrbuilt",
+        "taxstatus": "tax_status",
+        "propdir": "propdir",
+        "propstr": "propstr",
+    },
+    2021: {
+        "parcelno": "parcel_num",
+        "taxpayer": "taxpayer_1",
+        "taxpayer2": "taxpayer_2",
+        "propaddr": "address",
+        "tpaddr": "taxpayer_s",
+        "tpcity": "taxpayer_c",
+        "tpstate": "taxpayer_3",
+        "tpzip": "taxpayer_z",
+        "propzip": "zipcode",
+        "saledate": "sale_date",
+        "saleprice": "sale_price",
+        "totsqft": "total_squa",
+        "totacres": "total_acre",
+        "resyrbuilt": "year_built",
+        "taxstatus": "tax_status",
+        "propstr": "propstr",
+    },
+}
+
+# Column names of the city's parcel exports read by identify_ownership
+CITY_COLUMNS = {
+    2021: {
+        "parcelno": "parcelno",
+        "propaddr": "propaddr",
+        "taxpayer": "taxpayer_1",
+        "taxpayer2": "taxpayer_2",
+        "tpaddr": "tpaddr",
+        "tpcity": "tpcity",
+    },
+    2022: {
+        "parcelno": "parcelno",
+        "propaddr": "propaddr",
+        "taxpayer": "taxpayer_1",
+        "taxpayer2": "taxpayer_2",
+        "tpaddr": "taxpaddr",
+        "tpcity": "taxpcity",
+    },
+    2023: {
+        "parcelno": "pnum",
+        "propaddr": "addr",
+        "taxpayer": "owner1",
+        "taxpayer2": "owner2",
+        "tpaddr": "owner_street",
+        "tpcity": "owner_city",
+    },
+    2024: {
+        "parcelno": "parcel_number",
+        "propaddr": "address",
+        "taxpayer": "taxpayer_1",
+        "taxpayer2": "taxpayer_2",
+        "tpaddr": "taxpayer_street",
+        "tpcity": "taxpayer_city",
+    },
+    2025: {
+        "parcelno": "Parcel ID",
+        "propaddr": "Address",
+        "taxpayer": "Taxpayer 1",
+        "taxpayer2": "Taxpayer 2",
+        "tpaddr": "Taxpayer Address",
+        "tpcity": "Taxpayer City",
+        "tpstate": "Taxpayer State",
+        "saledate": "Sale Date",
+    },
+}
+
+# Attributes carried by the parcel shapefiles, within the 10 character limit
+SHAPEFILE_COLUMNS = {
+    "parcelno": "parcelno",
+    "propaddr": "propaddr",
+    "taxpayer": "taxpayer_1",
+    "taxpayer2": "taxpayer_2",
+    "tpaddr": "taxpayer_s",
+    "tpcity": "taxpayer_c",
+}
+
+# The city's 2022 export is a shapefile rather than a CSV
+CITY_SHAPEFILES = {2022: os.path.join("IPDS 2022", "det_20220000.shp")}
+
+# Years from which new owners are coded in own-id-{year}.csv, and city exports
+# are read by identify_ownership
+MAP_YEAR = 2021
+
+
+def columns_for(year, columns_by_year):
+    return columns_by_year[max(start for start in columns_by_year if start <= year)]
+
+
+def zipcodes(rng):
+    x0, y0, x1, y1 = BOUNDS
+    seeds = shapely.points(
+        rng.uniform(x0, x1, ZIP_COUNT), rng.uniform(y0, y1, ZIP_COUNT)
+    )
+    cells = shapely.get_parts(
+        shapely.voronoi_polygons(shapely.multipoints(seeds), extend_to=None)
+    )
+    return gpd.GeoDataFrame(
+        {"zipcode": [str(48201 + idx) for idx in range(len(cells))]},
+        geometry=shapely.intersection(cells, shapely.box(*BOUNDS)),
+        crs="EPSG:4326",
+    )
+
+
+# Parcels are laid out on a jittered grid so they don't overlap, and given extra
+# vertices along their edges to be closer to surveyed lot lines
+def parcel_geometries(rng, count):
+    x0, y0, x1, y1 = BOUNDS
+    side = int(np.ceil(np.sqrt(count)))
+    cell_x = (x1 - x0) / side
+    cell_y = (y1 - y0) / side
+    idx = np.arange(count)
+    left = x0 + (idx % side) * cell_x + rng.uniform(0, 0.2, count) * cell_x
+    bottom = y0 + (idx // side) * cell_y + rng.uniform(0, 0.2, count) * cell_y
+    width = rng.uniform(0.5, 0.8, count) * cell_x
+    height = rng.uniform(0.5, 0.8, count) * cell_y
+    return shapely.segmentize(
+        shapely.box(left, bottom, left + width, bottom + height), cell_x / 4
+    )
+
+
+def parcel_numbers(rng, count, start=0):
+    ward = rng.integers(1, 23, count)
+    number = np.arange(start, start + count) * 7 % 1_000_000
+    suffix = rng.choice(
+        ["", ".", "-", "L", ".001"], count, p=[0.3, 0.5, 0.1, 0.05, 0.05]
+    )
+    return np.char.add(
+        np.char.add(
+            np.char.zfill(ward.astype(str), 2), np.char.zfill(number.astype(str), 6)
+        ),
+        suffix,
+    ).astype(object)
+
+
+def owner_names(rng, count):
+    words = rng.choice(OWNER_WORDS, count)
+    kinds = rng.choice(OWNER_KINDS, count)
+    return [
+        f"{word} {kind} {idx}" for idx, (word, kind) in enumerate(zip(words, kinds))
+    ]
+
+
+# Each row spells its owner's name with one of the suffix variants seen in the
+# source data, and sometimes with extra spaces
+def spelled(rng, names):
+    names = pd.Series(names, dtype=object)
+    private = ~names.isin(PUBLIC_OWNERS)
+    suffixes = rng.choice(OWNER_SUFFIXES, len(names))
+    spaced = rng.random(len(names)) < 0.05
+    names = names.where(~private, names + suffixes)
+    return names.where(~(private & spaced), names.str.replace(" ", "  ", n=1))
+
+
+def sale_dates(rng, count, year):
+    dates = pd.to_datetime("1990-01-01") + pd.to_timedelta(
+        rng.integers(0, (year - 1990) * 365, count), "D"
+    )
+    formatted = dates.strftime("%m/%d/%Y" if year < 2019 else "%Y-%m-%d").to_numpy(
+        dtype=object
+    )
+    formatted[rng.random(count) < 0.15] = None
+    return formatted
+
+
+def write_shapefile(gdf, filename):
+    if not filename.endswith(".zip"):
+        gdf.to_file(filename)
+        return
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        name = os.path.basename(filename)[: -len(".zip")]
+        gdf.to_file(os.path.join(tmp_dir, name))
+        with zipfile.ZipFile(filename, "w") as zip_file:
+            for part in sorted(os.listdir(tmp_dir)):
+                zip_file.write(os.path.join(tmp_dir, part), part)
+
+
+# Writes an input/ tree with the same layout and column names as the real one:
+# the cleaned CSVs and shapefiles for each year, the zipcodes, the owner coding
+# files and the city's parcel exports
+def generate(input_dir, years, parcels, seed=0):
+    rng = np.random.default_rng(seed)
+    for dirname in ["praxis_csvs", "praxis_shapefiles", "city"]:
+        os.makedirs(os.path.join(input_dir, dirname), exist_ok=True)
+
+    zipcodes(rng).to_file(os.path.join(input_dir, "zipcodes.geojson"), driver="GeoJSON")
+
+    # Owner counts fall off like real ownership, a few own thousands of parcels
+    owners = np.array(owner_names(rng, max(parcels // 15, 10)), dtype=object)
+    weights = 1 / np.arange(1, len(owners) + 1) ** 0.9
+    weights = weights / weights.sum() * (1 - PUBLIC_SHARE)
+    owners = np.concatenate([np.array(PUBLIC_OWNERS, dtype=object), owners])
+    weights = np.concatenate([np.full(len(PUBLIC_OWNERS), PUBLIC_SHARE / 4), weights])
+    # Several taxpayer entities are often the same speculator
+    own_ids = np.concatenate(
+        [
+            np.array(PUBLIC_OWNERS, dtype=object),
+            np.char.add(
+                "SPECULATOR ",
+                (np.arange(len(owners) - len(PUBLIC_OWNERS)) // 3).astype(str),
+            ),
+        ]
+    )
+    coded = rng.random(len(owners)) < 0.5
+
+    parcelnos = parcel_numbers(rng, parcels)
+    geoms = parcel_geometries(rng, parcels)
+    owner_idx = rng.choice(len(owners), parcels, p=weights)
+    addresses = np.char.add(
+        np.arange(1, parcels + 1).astype(str),
+        np.char.add(" ", rng.choice(STREETS, parcels)),
+    ).astype(object)
+    next_parcel = parcels
+
+    own_id_map_rows = []
+    for year in years:
+        # Some parcels are replaced by new ones, and some change hands
+        replaced = rng.random(parcels) < PARCEL_TURNOVER
+        parcelnos[replaced] = parcel_numbers(rng, replaced.sum(), next_parcel)
+        next_parcel += replaced.sum()
+        sold = rng.random(parcels) < OWNER_TURNOVER
+        owner_idx[sold] = rng.choice(len(owners), sold.sum(), p=weights)
+
+        taxpayers = spelled(rng, owners[owner_idx])
+        year_df = pd.DataFrame(
+            {
+                "parcelno": parcelnos,
+                "taxpayer": taxpayers,
+                "taxpayer2": np.where(rng.random(parcels) < 0.1, "C/O AGENT", None),
+                "propaddr": addresses,
+                "tpaddr": rng.choice(STREETS, parcels),
+                "tpcity": rng.choice(["DETROIT", "SOUTHFIELD", "DEARBORN"], parcels),
+                "tpstate": "MI",
+                "tpzip": rng.choice(["48201", "48226", "48075-1234"], parcels),
+                "propzip": rng.choice(["48201", "48204-2210", "48227", None], parcels),
+                "saledate": sale_dates(rng, parcels, year),
+                "saleprice": rng.integers(0, 200_000, parcels),
+                "totsqft": rng.integers(500, 8_000, parcels),
+                "totacres": rng.random(parcels).round(3),
+                "resyrbuilt": rng.choice(["1925", "1950", "0", None], parcels),
+                "taxstatus": rng.choice(["TAXABLE", "EXEMPT"], parcels),
+                "propno": np.arange(1, parcels + 1),
+                "propdir": rng.choice(["", "E", "W"], parcels),
+                "propstr": rng.choice(STREETS, parcels),
+            }
+        )
+
+        columns = columns_for(year, CSV_COLUMNS)
+        csv_df = year_df[list(columns)].rename(columns=columns)
+        csv_df["own_id"] = np.where(coded[owner_idx], own_ids[owner_idx], None)
+        csv_df.to_csv(
+            os.path.join(input_dir, "praxis_csvs", f"PPlusFinal_{year}_edit.csv"),
+            index=False,
+        )
+
+        if year >= MAP_YEAR:
+            city_columns = columns_for(year, CITY_COLUMNS)
+            city_df = year_df[list(city_columns)].rename(columns=city_columns)
+            if year in CITY_SHAPEFILES:
+                city_filename = os.path.join(input_dir, "city", CITY_SHAPEFILES[year])
+                os.makedirs(os.path.dirname(city_filename), exist_ok=True)
+                gpd.GeoDataFrame(city_df, geometry=geoms, crs="EPSG:4326").to_file(
+                    city_filename
+                )
+            else:
+                city_df.to_csv(
+                    os.path.join(input_dir, "city", f"parcels_{year}.csv"), index=False
+                )
+            year_coded = np.unique(owner_idx[coded[owner_idx]])
+            pd.DataFrame(
+                {"taxpayer": owners[year_coded], "owner": own_ids[year_coded]}
+            ).to_csv(os.path.join(input_dir, f"own-id-{year}.csv"), index=False)
+
+        # Some parcels are drawn as several polygons that clean_files dissolves
+        split = np.flatnonzero(rng.random(parcels) < 0.02)
+        shp_df = gpd.GeoDataFrame(
+            pd.concat([year_df, year_df.iloc[split]])[list(SHAPEFILE_COLUMNS)]
+            .rename(columns=SHAPEFILE_COLUMNS)
+            .reset_index(drop=True),
+            geometry=np.concatenate(
+                [geoms, shapely.transform(geoms[split], lambda coords: coords + 1e-4)]
+            ),
+            crs="EPSG:4326",
+        ).to_crs("EPSG:2898")
+        shp_name = f"praxis{year}.shp.zip" if year < 2022 else f"praxis{year}.shp"
+        write_shapefile(shp_df, os.path.join(input_dir, "praxis_shapefiles", shp_name))
+        own_id_map_rows.append(
+            pd.DataFrame(
+                {
+                    "taxpayer1": taxpayers[coded[owner_idx]],
+                    "taxpayer2": None,
+                    "own_id": own_ids[owner_idx][coded[owner_idx]],
+                }
+            ).drop_duplicates()
+        )
+        print(f"generated {year}: {parcels} parcels, {len(shp_df)} shapes")
+
+    pd.concat(own_id_map_rows).drop_duplicates().to_csv(
+        os.path.join(input_dir, "own-id-map.csv"), index=False
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        sys.exit("usage: python scripts/synthetic.py INPUT_DIR PARCELS YEARS")
+    # Never written over an existing tree, which could be the real inputs
+    if os.path.exists(sys.argv[1]):
+        sys.exit(f"{sys.argv[1]} already exists")
+    generate(
+        sys.argv[1], [int(year) for year in sys.argv[3].split(",")], int(sys.argv[2])
+    )
@@ -23,7 +23,7 @@ CREATE TABLE parcels (
     centroid GEOMETRY(POINT, 4326),
     geom GEOMETRY(GEOMETRY, 4326),
     CONSTRAINT parcels_pk PRIMARY KEY (feature_id, year)
-);
+) PARTITION BY LIST (year);
 
 CREATE INDEX parcels_parcelno_index ON parcels (parcelno);
 
@@ -50,4 +50,43 @@ CREATE MATERIALIZED VIEW owner_count AS (
             p.own_group,
             p.count
     )
-);
\ No newline at end of file
+);
+-- Unique indexes let the aggregates be refreshed concurrently after a load
+CREATE UNIQUE INDEX owner_count_year_own_id_idx ON owner_count (year, own_id);
+
+CREATE MATERIALIZED VIEW zip_count AS (
+    SELECT
+        p.year,
+        p.propzip,
+        count(*) AS count,
+        count(DISTINCT p.own_id) AS own_count
+    FROM
+        parcels AS p
+    WHERE
+        p.propzip IS NOT NULL
+    GROUP BY
+        p.year,
+        p.propzip
+);
+
+CREATE UNIQUE INDEX zip_count_year_propzip_idx ON zip_count (year, propzip);
+
+CREATE MATERIALIZED VIEW owner_zip_count AS (
+    SELECT
+        p.year,
+        p.own_id,
+        p.propzip,
+        count(*) AS count
+    FROM
+        parcels AS p
+    WHERE
+        p.propzip IS NOT NULL
+    GROUP BY
+        p.year,
+        p.own_id,
+        p.propzip
+);
+
+CREATE UNIQUE INDEX owner_zip_count_year_own_id_propzip_idx ON owner_zip_count (year, own_id, propzip);
+
+CREATE INDEX owner_zip_count_year_propzip_idx ON owner_zip_count (year, propzip);
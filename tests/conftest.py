@@ -0,0 +1,86 @@
+import os
+import re
+
+import database
+import pytest
+from sqlalchemy import create_engine
+
+TEST_SCHEMA = "loading_test"
+SCHEMA_FILENAME = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "sql", "schema.sql"
+)
+
+
+# Tests that need Postgres run against DATABASE_URL. The loader's live, staging and
+# retired schemas are swapped for scratch ones, which are dropped again afterwards.
+@pytest.fixture
+def engine(monkeypatch):
+    if "DATABASE_URL" not in os.environ:
+        pytest.skip("DATABASE_URL is not set")
+    schemas = {
+        "LIVE_SCHEMA": TEST_SCHEMA,
+        "STAGING_SCHEMA": f"{TEST_SCHEMA}_staging",
+        "RETIRED_SCHEMA": f"{TEST_SCHEMA}_retired",
+    }
+    for attr, schema in schemas.items():
+        monkeypatch.setattr(database, attr, schema)
+
+    engine = create_engine(os.environ["DATABASE_URL"])
+    drop_schemas = "; ".join(
+        f"DROP SCHEMA IF EXISTS {schema} CASCADE" for schema in schemas.values()
+    )
+    with engine.begin() as conn:
+        conn.exec_driver_sql(drop_schemas)
+        conn.exec_driver_sql(f"CREATE SCHEMA {TEST_SCHEMA}")
+    yield engine
+    with engine.begin() as conn:
+        conn.exec_driver_sql(drop_schemas)
+    engine.dispose()
+
+
+def has_postgis(engine):
+    with engine.connect() as conn:
+        return bool(
+            conn.exec_driver_sql(
+                "SELECT count(*) FROM pg_proc WHERE proname = 'postgis_version'"
+            ).scalar()
+        )
+
+
+@pytest.fixture
+def postgis(engine):
+    if not has_postgis(engine):
+        pytest.skip("PostGIS is not installed")
+    return engine
+
+
+# sql/schema.sql, with geometries stored as text and plain B-tree indexes where
+# PostGIS or pg_trgm aren't installed, so the tables, partitions and views can
+# still be checked
+@pytest.fixture
+def schema_filename(engine, tmp_path):
+    with engine.connect() as conn:
+        extensions = {
+            name
+            for (name,) in conn.exec_driver_sql(
+                "SELECT name FROM pg_available_extensions"
+            )
+        }
+        has_trgm = conn.exec_driver_sql(
+            "SELECT count(*) FROM pg_opclass WHERE opcname = 'gin_trgm_ops'"
+        ).scalar()
+    if not {"postgis", "pg_trgm"} <= extensions:
+        pytest.skip("the postgis and pg_trgm extensions aren't available")
+
+    with open(SCHEMA_FILENAME) as schema_file:
+        schema_sql = schema_file.read()
+    if not has_postgis(engine):
+        schema_sql = re.sub(r"GEOMETRY\(\w+, \d+\)", "TEXT", schema_sql)
+        schema_sql = schema_sql.replace("USING gist", "USING btree")
+    if not has_trgm:
+        schema_sql = schema_sql.replace(
+            "USING gin(propzip gin_trgm_ops)", "USING btree(propzip)"
+        )
+    filename = tmp_path / "schema.sql"
+    filename.write_text(schema_sql)
+    return str(filename)
@@ -0,0 +1,275 @@
+import logging
+
+import database
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import TEST_SCHEMA
+from database import (
+    check_staging_counts,
+    copy_frame,
+    create_staging_schema,
+    create_year_partitions,
+    ewkb_frame,
+    refresh_views,
+    replace_year_partition,
+    schema_relations,
+    swap_staging_schema,
+)
+from geopandas.io.sql import _convert_to_ewkb, _get_srid_from_crs
+from shapely.geometry import Point, Polygon
+from sqlalchemy import create_engine
+from sqlalchemy.exc import ProgrammingError
+
+TEXT = ["plain", None, 'say "hi"', "a, b", "two\nlines", "", "back\\slash", "'"]
+
+
+def text_frame():
+    return pd.DataFrame(
+        {
+            "name": pd.Series(TEXT, dtype="string[pyarrow]"),
+            "count": pd.Series([1, None, 3, 4, None, 6, 7, 8], dtype="Int64"),
+            "price": [1.5, np.nan, 3.0, 4.25, 5.0, np.nan, 7.0, 8.0],
+        }
+    )
+
+
+def geo_frame(crs="EPSG:4326"):
+    return gpd.GeoDataFrame(
+        {"feature_id": [1, 2, 3]},
+        geometry=[
+            Point(-83.05, 42.33),
+            Polygon([(-83.1, 42.3), (-83.0, 42.3), (-83.0, 42.4)]),
+            None,
+        ],
+        crs=crs,
+    )
+
+
+# Without a CRS to_postgis sends -1, which PostGIS stores as its unknown SRID 0
+@pytest.mark.parametrize("crs", ["EPSG:4326", "EPSG:2898", None])
+def test_ewkb_matches_to_postgis(crs):
+    gdf = geo_frame(crs)
+    srid = _get_srid_from_crs(gdf) if crs else 0
+    expected = _convert_to_ewkb(gdf, "geometry", srid)
+    assert ewkb_frame(gdf)["geometry"].tolist() == expected["geometry"].tolist()
+
+
+def test_copy_frame_round_trips_text(engine):
+    df = text_frame()
+
+    assert copy_frame(engine, "copied", df, schema=TEST_SCHEMA) == len(df)
+
+    loaded = pd.read_sql(f"SELECT * FROM {TEST_SCHEMA}.copied", engine)
+    assert loaded["name"].tolist() == TEXT
+    assert loaded["count"].astype("Int64").tolist() == df["count"].tolist()
+    assert loaded["price"].tolist() == pytest.approx(df["price"].tolist(), nan_ok=True)
+
+
+# The same frame loaded by COPY and by to_postgis gives the same column type and
+# the same geometries
+def test_copy_frame_matches_to_postgis(postgis):
+    gdf = geo_frame()
+    gdf.to_postgis("inserted", postgis, schema=TEST_SCHEMA, index=False)
+    copy_frame(postgis, "copied", gdf, schema=TEST_SCHEMA)
+
+    with postgis.connect() as conn:
+        columns = conn.exec_driver_sql(
+            "SELECT f_table_name, type, srid FROM geometry_columns "
+            f"WHERE f_table_schema = '{TEST_SCHEMA}' ORDER BY 1"
+        ).all()
+        geometries = [
+            conn.exec_driver_sql(
+                f"SELECT feature_id, ST_AsEWKT(geometry) FROM {TEST_SCHEMA}.{table} "
+                "ORDER BY feature_id"
+            ).all()
+            for table in ["copied", "inserted"]
+        ]
+    assert columns[0][1:] == columns[1][1:]
+    assert geometries[0] == geometries[1]
+
+
+def parcels_frame(years, owners):
+    rows = [
+        {
+            "feature_id": feature_id,
+            "year": year,
+            "own_id": owner,
+            "own_group": 1,
+            "count": 1,
+            "propzip": f"4820{feature_id % 3}",
+        }
+        for year in years
+        for feature_id, owner in enumerate(owners)
+    ]
+    return pd.DataFrame(rows)
+
+
+def stage_parcels(engine, schema_filename, df):
+    create_staging_schema(engine, schema_filename)
+    create_year_partitions(
+        engine, "parcels", sorted(df["year"].unique()), schema=database.STAGING_SCHEMA
+    )
+    copy_frame(engine, "parcels", df, schema=database.STAGING_SCHEMA)
+    refresh_views(engine, database.STAGING_SCHEMA)
+    check_staging_counts(engine, {"parcels": len(df)})
+
+
+def live_owners(engine):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql(
+            f"SELECT year, own_id FROM {TEST_SCHEMA}.owner_count ORDER BY 1, 2"
+        ).all()
+
+
+def schemas(engine):
+    with engine.connect() as conn:
+        return {
+            name
+            for (name,) in conn.exec_driver_sql(
+                "SELECT nspname FROM pg_namespace "
+                f"WHERE starts_with(nspname, '{TEST_SCHEMA}')"
+            )
+        }
+
+
+# The second swap replaces tables and the materialized views built over them
+def test_swap_replaces_live_relations(engine, schema_filename):
+    stage_parcels(engine, schema_filename, parcels_frame([2020, 2021], ["A", "B"]))
+    swap_staging_schema(engine)
+    stage_parcels(engine, schema_filename, parcels_frame([2021], ["C"]))
+    swap_staging_schema(engine)
+
+    assert live_owners(engine) == [(2021, "C")]
+    assert schemas(engine) == {TEST_SCHEMA}
+
+
+def test_swap_drops_views_before_the_views_they_read(engine, schema_filename):
+    with open(schema_filename, "a") as schema_file:
+        schema_file.write(
+            "\nCREATE MATERIALIZED VIEW owners AS "
+            "SELECT DISTINCT own_id FROM owner_count;"
+        )
+    stage_parcels(engine, schema_filename, parcels_frame([2020], ["A"]))
+    swap_staging_schema(engine)
+    stage_parcels(engine, schema_filename, parcels_frame([2020], ["B"]))
+    swap_staging_schema(engine)
+
+    with engine.connect() as conn:
+        owners = conn.exec_driver_sql(f"SELECT own_id FROM {TEST_SCHEMA}.owners").all()
+    assert owners == [("B",)]
+
+
+def test_swap_stops_for_views_it_would_drop(engine, schema_filename):
+    stage_parcels(engine, schema_filename, parcels_frame([2020], ["A"]))
+    swap_staging_schema(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            f"CREATE VIEW {TEST_SCHEMA}.parcel_years AS "
+            f"SELECT DISTINCT year FROM {TEST_SCHEMA}.parcels"
+        )
+    stage_parcels(engine, schema_filename, parcels_frame([2021], ["B"]))
+
+    with pytest.raises(ValueError, match="parcel_years"):
+        swap_staging_schema(engine)
+
+    assert live_owners(engine) == [(2020, "A")]
+    assert database.STAGING_SCHEMA in schemas(engine)
+
+
+# A statement failing after the live relations have been moved out leaves them
+# where they were
+def test_failed_swap_leaves_live_schema(engine, schema_filename, monkeypatch):
+    stage_parcels(engine, schema_filename, parcels_frame([2020], ["A"]))
+    swap_staging_schema(engine)
+    stage_parcels(engine, schema_filename, parcels_frame([2021], ["B"]))
+
+    def relations_with_missing(conn, schema):
+        relations = schema_relations(conn, schema)
+        if schema == database.STAGING_SCHEMA:
+            relations.append(("missing", "r"))
+        return relations
+
+    monkeypatch.setattr(database, "schema_relations", relations_with_missing)
+    with pytest.raises(ProgrammingError, match="missing"):
+        swap_staging_schema(engine)
+
+    assert live_owners(engine) == [(2020, "A")]
+    assert schemas(engine) == {TEST_SCHEMA, database.STAGING_SCHEMA}
+
+
+@pytest.mark.parametrize("expected", [0, 2])
+def test_check_staging_counts_rejects_wrong_counts(engine, expected):
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"CREATE SCHEMA {database.STAGING_SCHEMA}")
+        conn.exec_driver_sql(
+            f"CREATE TABLE {database.STAGING_SCHEMA}.parcels (year INTEGER)"
+        )
+        if expected:
+            conn.exec_driver_sql(
+                f"INSERT INTO {database.STAGING_SCHEMA}.parcels VALUES (2020)"
+            )
+
+    with pytest.raises(ValueError, match="parcels has"):
+        check_staging_counts(engine, {"parcels": expected})
+
+
+def partition_indexes(conn, partition):
+    return conn.exec_driver_sql(
+        f"""
+        SELECT c.relname, parent.relname
+        FROM pg_index AS i
+        JOIN pg_class AS c ON c.oid = i.indexrelid
+        LEFT JOIN pg_inherits AS inh ON inh.inhrelid = i.indexrelid
+        LEFT JOIN pg_class AS parent ON parent.oid = inh.inhparent
+        WHERE i.indrelid = '{TEST_SCHEMA}.{partition}'::regclass
+        ORDER BY 1
+        """
+    ).all()
+
+
+# The replaced partition is attached without scanning it, adopts its indexes into
+# the parent's, and the aggregates over the parent can still refresh concurrently
+def test_replace_year_partition(engine, schema_filename, caplog):
+    stage_parcels(engine, schema_filename, parcels_frame([2020, 2021], ["A", "B"]))
+    swap_staging_schema(engine)
+
+    # The psycopg2 dialect logs the server's messages
+    caplog.set_level(logging.INFO, logger="sqlalchemy.dialects.postgresql")
+    debug_engine = create_engine(
+        engine.url, connect_args={"options": "-c client_min_messages=debug1"}
+    )
+    replace_year_partition(
+        debug_engine, "parcels", 2021, parcels_frame([2021], ["C", "D", "E"])
+    )
+    debug_engine.dispose()
+    refresh_views(engine, TEST_SCHEMA, concurrently=True)
+
+    assert (
+        'DEBUG:  partition constraint for table "parcels_2021" is implied by '
+        "existing constraints" in caplog.messages
+    )
+    assert not [
+        message
+        for message in caplog.messages
+        if message.startswith("DEBUG:  building index")
+        and 'on table "parcels_2021"' in message
+    ]
+    with engine.connect() as conn:
+        kept = partition_indexes(conn, "parcels_2020")
+        replaced = partition_indexes(conn, "parcels_2021")
+        invalid = conn.exec_driver_sql(
+            f"SELECT count(*) FROM pg_index WHERE NOT indisvalid "
+            f"AND indrelid = '{TEST_SCHEMA}.parcels'::regclass"
+        ).scalar()
+    assert all(parent for _, parent in replaced)
+    assert replaced == [(name.replace("2020", "2021"), parent) for name, parent in kept]
+    assert invalid == 0
+    assert live_owners(engine) == [
+        (2020, "A"),
+        (2020, "B"),
+        (2021, "C"),
+        (2021, "D"),
+        (2021, "E"),
+    ]
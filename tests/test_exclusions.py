@@ -0,0 +1,38 @@
+import pandas as pd
+from exclusions import (
+    CLEAN_EXCLUDED_PATTERN,
+    OWN_ID_MAP_EXCLUDED_PATTERN,
+    contains_any,
+    excluded_owners,
+)
+
+OWNERS = pd.DataFrame(
+    {
+        "own_id": ["VHS HARPER HOSPITAL", "VHS OF MICHIGAN", "SMITH JOHN", None],
+        "taxpayer": ["VHS HARPER", "VHS CHILDRENS", "SMITH JOHN", "HUD"],
+    }
+)
+
+
+def test_clean_files_only_excludes_vhs_harper():
+    excluded = excluded_owners(
+        OWNERS, ["own_id", "taxpayer"], "taxpayer", CLEAN_EXCLUDED_PATTERN
+    )
+    assert excluded.tolist() == [True, False, False, True]
+
+
+def test_own_id_map_excludes_every_vhs_name():
+    excluded = excluded_owners(
+        OWNERS, ["own_id", "taxpayer"], "taxpayer", OWN_ID_MAP_EXCLUDED_PATTERN
+    )
+    assert excluded.tolist() == [True, True, False, True]
+
+
+def test_terms_match_literally_and_nulls_never_match():
+    names = pd.Series(["A.B. LAND BANK", "DEPT OF X", None, "DEPTXOF"])
+    assert contains_any(names, CLEAN_EXCLUDED_PATTERN).tolist() == [
+        True,
+        True,
+        False,
+        False,
+    ]